@@ -1,4 +1,12 @@
 from .base import BaseBrowser
-from .fleet import FleetBrowser
+from .pool import BrowserPool, PooledBrowser
 
-__all__ = ["BaseBrowser", "FleetBrowser"]
+__all__ = ["BaseBrowser", "BrowserPool", "FleetBrowser", "PooledBrowser"]
+
+
+def __getattr__(name: str):
+    # FleetBrowser pulls in the raccoonai SDK, so it is only imported when first used.
+    if name == "FleetBrowser":
+        from .fleet import FleetBrowser
+        return FleetBrowser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
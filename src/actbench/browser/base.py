@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 
@@ -10,3 +11,9 @@ class BaseBrowser(ABC):
     @abstractmethod
     def terminate(self):
         pass
+
+    async def aget_cdp_url(self, url: str) -> str:
+        return await asyncio.to_thread(self.get_cdp_url, url)
+
+    async def aterminate(self):
+        await asyncio.to_thread(self.terminate)
@@ -2,6 +2,7 @@ from raccoonai import RaccoonAI
 from raccoonai.types import fleet_create_params
 
 from .base import BaseBrowser
+from ..ratelimit import get_rate_limiter
 
 
 class FleetBrowser(BaseBrowser):
@@ -10,17 +11,19 @@ class FleetBrowser(BaseBrowser):
         self.session_id = None
 
     def get_cdp_url(self, url: str) -> str:
-        browser = self.client.fleet.create(
-            raccoon_passcode="actbench",
-            url=url,
-            advanced=fleet_create_params.Advanced(
-                block_ads=True,
-                solve_captchas=True
+        with get_rate_limiter("fleet").limit():
+            browser = self.client.fleet.create(
+                raccoon_passcode="actbench",
+                url=url,
+                advanced=fleet_create_params.Advanced(
+                    block_ads=True,
+                    solve_captchas=True
+                )
             )
-        )
         self.session_id = browser.session_id
         cdp_url = browser.websocket_url
         return cdp_url
 
     def terminate(self):
-        self.client.fleet.terminate(self.session_id)
+        with get_rate_limiter("fleet").limit():
+            self.client.fleet.terminate(self.session_id)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext
+
+from ..timing import span
+
+
+class _Process:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.started = 0
+        self.active = 0
+        self.retiring = False
+
+    def alive(self) -> bool:
+        playwright_browser = self.browser.playwright_browser
+        return playwright_browser is not None and playwright_browser.is_connected()
+
+
+class LocalBrowser:
+    """A task's handle on a shared local Chromium: an isolated incognito context rather than a CDP endpoint.
+
+    Unlike a `BaseBrowser` it has no CDP URL and can only be used from the event loop that runs the tasks, so
+    clients check for it and call `new_context` instead of `aget_cdp_url`.
+    """
+
+    def __init__(self, manager: "LocalBrowserManager"):
+        self._manager = manager
+        self._process: Optional[_Process] = None
+        self.context: Optional[BrowserContext] = None
+
+    async def new_context(self) -> BrowserContext:
+        """Opens this task's browser context on one of the manager's Chromium processes."""
+        if self.context is None:
+            with span("browser_wait"):
+                self._process = await self._manager._acquire()
+            self.context = BrowserContext(browser=self._process.browser,
+                                          config=self._process.browser.config.new_context_config)
+        return self.context
+
+    async def aterminate(self):
+        """Closes the context and gives its process back to the manager. Does nothing after the first call."""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        with span("browser_terminate"):
+            try:
+                await self.context.close()
+            except Exception as e:
+                logging.error(f"Failed to close local browser context: {e}")
+            await self._manager._release(process)
+
+
+class LocalBrowserManager:
+    """Runs a fixed number of local Chromium processes for the whole run and shares them between tasks.
+
+    Each task gets its own incognito context on the least busy process. A process is replaced after
+    `tasks_per_process` tasks, once its open contexts have closed, or as soon as it is found to have crashed.
+    All methods must be called from the event loop that runs the tasks.
+    """
+
+    def __init__(self, processes: int = 2, tasks_per_process: int = 25, config: Optional[BrowserConfig] = None):
+        self.processes = processes
+        self.tasks_per_process = tasks_per_process
+        self.config = config or BrowserConfig()
+        self.launched = 0
+        self.recycled = 0
+        self.crashed = 0
+        self._slots: List[Optional[_Process]] = [None] * processes
+        self._retired: List[_Process] = []
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _launch(self) -> _Process:
+        browser = Browser(config=self.config)
+        await browser.get_playwright_browser()
+        self.launched += 1
+        return _Process(browser)
+
+    async def _acquire(self) -> _Process:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for i, process in enumerate(self._slots):
+                if process is not None and not process.alive():
+                    self.crashed += 1
+                    await self._retire(process)
+                    self._slots[i] = None
+            i = min(range(self.processes),
+                    key=lambda j: (self._slots[j] is not None, self._slots[j].active if self._slots[j] else 0))
+            if self._slots[i] is None:
+                self._slots[i] = await self._launch()
+            process = self._slots[i]
+            process.started += 1
+            process.active += 1
+            if process.started >= self.tasks_per_process:
+                # Retire the process: it finishes its current tasks and a fresh one takes its slot.
+                self._slots[i] = None
+                self.recycled += 1
+                process.retiring = True
+                self._retired.append(process)
+            return process
+
+    async def _release(self, process: _Process) -> None:
+        process.active -= 1
+        if process.retiring and process.active == 0:
+            await self._retire(process)
+        elif not process.alive() and process in self._slots:
+            self.crashed += 1
+            self._slots[self._slots.index(process)] = None
+            await self._retire(process)
+
+    async def _retire(self, process: _Process) -> None:
+        if process in self._retired:
+            self._retired.remove(process)
+        try:
+            await process.browser.close()
+        except Exception as e:
+            logging.error(f"Failed to close local browser: {e}")
+
+    @asynccontextmanager
+    async def lease(self):
+        """Yields a `LocalBrowser` for one task and closes its context on exit, even if the task raised."""
+        browser = LocalBrowser(self)
+        try:
+            yield browser
+        finally:
+            await browser.aterminate()
+
+    async def aclose(self) -> None:
+        """Closes every Chromium process, including ones still being recycled."""
+        processes = [process for process in self._slots if process is not None] + self._retired
+        self._slots = [None] * self.processes
+        self._retired = []
+        for process in processes:
+            try:
+                await process.browser.close()
+            except Exception as e:
+                logging.error(f"Failed to close local browser: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"processes": self.processes, "tasks_per_process": self.tasks_per_process,
+                "launched": self.launched, "recycled": self.recycled, "crashed": self.crashed}
@@ -0,0 +1,207 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Callable, Deque, Dict, Any, Iterable, Optional
+
+from .base import BaseBrowser
+from ..stats import QuantileSketch
+from ..timing import add_phase, span
+
+
+class _Session:
+    def __init__(self, browser: BaseBrowser, cdp_url: str, provision_ms: float):
+        self.browser = browser
+        self.cdp_url = cdp_url
+        self.provision_ms = provision_ms
+
+
+class PooledBrowser(BaseBrowser):
+    """The browser handed to a single task. Its session comes from the pool and is terminated exactly once."""
+
+    def __init__(self, pool: "BrowserPool", url: str):
+        self._pool = pool
+        self._url = url
+        self._session: Optional[_Session] = None
+        # Whether this task was removed from the pool's plan, which happens once, on the first `get_cdp_url`.
+        self._claimed = False
+        self._terminated = False
+        self._lock = threading.Lock()
+
+    def get_cdp_url(self, url: str) -> str:
+        with self._lock:
+            if self._session is None:
+                with span("browser_wait"):
+                    future = None
+                    if not self._claimed:
+                        self._claimed = True
+                        future = self._pool._claim(url)
+                    self._session = self._pool._take(url, future)
+                add_phase("browser_create", self._session.provision_ms)
+            return self._session.cdp_url
+
+    def terminate(self):
+        with self._lock:
+            if self._session is None or self._terminated:
+                return
+            self._terminated = True
+        with span("browser_terminate"):
+            self._pool._terminate(self._session)
+
+    def close(self) -> None:
+        """Terminates the session, or gives back the one warmed for this task if it never asked for one."""
+        with self._lock:
+            unused = not self._claimed
+        if unused:
+            self._pool._discard(self._url)
+        else:
+            self.terminate()
+
+
+class BrowserPool:
+    """Provisions browser sessions for upcoming tasks ahead of time, so tasks do not wait on session creation.
+
+    `schedule` is given the URLs of the tasks in the order they will be started; up to `size` sessions for
+    the next of them are created in the background. A task leasing a URL gets the session warmed for it
+    (a hit), or one created on demand (a miss). Leases always terminate their session, and `close`
+    terminates every session that was never handed out. With `size=0` sessions are only created on demand.
+    """
+
+    def __init__(self, factory: Callable[[], BaseBrowser], size: int = 2):
+        self.factory = factory
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.provision_ms = QuantileSketch()
+        self.wait_ms = QuantileSketch()
+        self._lock = threading.Lock()
+        self._upcoming: Deque[str] = deque()
+        self._ready: Dict[str, Deque[concurrent.futures.Future]] = {}
+        self._warm = 0
+        self._closed = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="browser-pool") if size else None
+
+    def schedule(self, urls: Iterable[str]) -> None:
+        """Queues the URLs of upcoming tasks, in the order the tasks will start."""
+        with self._lock:
+            self._upcoming.extend(urls)
+            self._fill()
+
+    def _fill(self) -> None:
+        while self._executor is not None and not self._closed and self._warm < self.size and self._upcoming:
+            url = self._upcoming.popleft()
+            self._warm += 1
+            self._ready.setdefault(url, deque()).append(self._executor.submit(self._provision, url))
+
+    def _provision(self, url: str) -> _Session:
+        browser = self.factory()
+        start = time.perf_counter()
+        cdp_url = browser.get_cdp_url(url)
+        provision_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.provision_ms.add(provision_ms)
+        return _Session(browser, cdp_url, provision_ms)
+
+    def _pop(self, url: str) -> Optional[concurrent.futures.Future]:
+        """Removes the task for `url` from the pool's plan, returning its warm session if it has one."""
+        ready = self._ready.get(url)
+        if ready:
+            future = ready.popleft()
+            if not ready:
+                del self._ready[url]
+            self._warm -= 1
+            return future
+        try:
+            self._upcoming.remove(url)
+        except ValueError:
+            pass
+        return None
+
+    def _claim(self, url: str) -> Optional[concurrent.futures.Future]:
+        with self._lock:
+            future = self._pop(url)
+            self._fill()
+        return future
+
+    def _take(self, url: str, future: Optional[concurrent.futures.Future]) -> _Session:
+        """Waits for the warm session `_claim` returned for `url`, or provisions one if there is none."""
+        start = time.perf_counter()
+        session = None
+        if future is not None:
+            try:
+                session = future.result()
+            except Exception as e:
+                logging.error(f"Pre-provisioning a browser session for {url} failed: {e}")
+        hit = session is not None
+        if session is None:
+            session = self._provision(url)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.wait_ms.add((time.perf_counter() - start) * 1000)
+        return session
+
+    def _discard(self, url: str) -> None:
+        future = self._claim(url)
+        if future is not None:
+            future.add_done_callback(self._terminate_future)
+
+    def _terminate_future(self, future: concurrent.futures.Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self._terminate(future.result())
+
+    @staticmethod
+    def _terminate(session: _Session) -> None:
+        try:
+            session.browser.terminate()
+        except Exception as e:
+            logging.error(f"Failed to terminate browser session: {e}")
+
+    @contextmanager
+    def lease(self, url: str):
+        """Yields the browser for one task and terminates its session on exit, even if the task raised."""
+        browser = PooledBrowser(self, url)
+        try:
+            yield browser
+        finally:
+            browser.close()
+
+    @asynccontextmanager
+    async def alease(self, url: str):
+        browser = PooledBrowser(self, url)
+        try:
+            yield browser
+        finally:
+            await asyncio.to_thread(browser.close)
+
+    def close(self) -> None:
+        """Stops warming sessions and terminates the ones that were never handed out."""
+        with self._lock:
+            self._closed = True
+            futures = [future for ready in self._ready.values() for future in ready]
+            self._ready.clear()
+            self._upcoming.clear()
+            self._warm = 0
+        for future in futures:
+            if not future.cancel():
+                future.add_done_callback(self._terminate_future)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            leased = self.hits + self.misses
+            return {
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / leased if leased else None,
+                "provision_ms_avg": self.provision_ms.mean,
+                "wait_ms_avg": self.wait_ms.mean,
+            }
@@ -1,4 +1,4 @@
-import concurrent.futures
+import functools
 import json
 import logging
 import os
@@ -8,32 +8,53 @@ import threading
 import time
 import uuid
 import warnings
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
 
 import click
-from langsmith.utils import LangSmithMissingAPIKeyWarning
 from pyfiglet import Figlet
-from rich.console import Console
+from rich.console import Console, Group
 from rich.live import Live
+from rich.markup import escape
 from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn, MofNCompleteColumn
 from rich.table import Table
 
 from . import __version__
-from .datasets import load_task_data, get_all_task_ids, get_all_tasks
+from .datasets import load_task_data, get_all_task_ids, get_all_tasks, get_dataset_hash
 from .executor import TaskExecutor
+from .executor.concurrency import AIMDController
+from .executor.engine import run_async, run_threaded
+from .executor.scheduling import SCHEDULES, DomainScheduler, DurationModel, domain_of, lpt_order, predict_makespan
+from .executor.sharding import parse_shard, shard_of
+from .ratelimit import PROVIDERS, apply_rate_limits
 from .storage import (
-    get_all_results,
+    SCORE_WRITER,
+    close_result_writer,
+    get_result_writer,
+    get_run_metadata,
+    save_run_metadata,
     get_all_api_keys,
     insert_api_key,
-    get_results_by_agent,
-    get_results_by_run_id
+    import_legacy_results,
+    merge_run,
+    iter_results,
+    iter_latencies,
+    load_response,
+    load_responses,
+    search_results,
+    save_run_summaries,
+    refresh_run_summaries,
+    get_run_summaries
 )
+from .storage.export import EXPORT_FORMATS, export_results as write_export
+from .storage.summaries import aggregator_from_summaries
+from .stats import AgentStats, RunAggregator
+from .timing import PHASES
 
 logging.basicConfig(
     level=logging.ERROR,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
-warnings.filterwarnings("ignore", category=LangSmithMissingAPIKeyWarning)
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 
 AGENTS = [
@@ -51,6 +72,20 @@ AGENTS = [
     }
 ]
 
+MAX_PARALLEL = 1000
+MAX_THREAD_PARALLEL = 20
+MAX_PROCESS_PARALLEL = 64
+
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]
+
+LIST_PAGE_SIZE = 50
+RESPONSE_PREVIEW_CHARS = 80
+# Domains shown in the progress view, busiest first.
+DOMAIN_TABLE_ROWS = 8
+# `results list --sort` values and the stored field each sorts by.
+LIST_SORT_KEYS = {f"{prefix}{name}": field for name, field in
+                  (("timestamp", "timestamp"), ("latency", "latency_ms"), ("score", "score")) for prefix in ("", "-")}
+
 shutdown_in_progress = False
 live: Live | None = None
 progress: Progress | None = None
@@ -64,77 +99,342 @@ def print_ascii(console: Optional[Console] = None):
     console.print(f"[bold white]{ascii_art}[/bold white]")
 
 
-def generate_summary_table(results_: List[Dict[str, Any]], run_id: str) -> Table:
-    table = Table(title="Benchmark Summary", show_header=True, header_style="bold magenta")
-    table.add_column("Run ID", style="dim")
-    table.add_column("Agent", style="dim")
+def _summary_cells(stats: AgentStats) -> List[str]:
+    latency = stats.latency
+    return [
+        str(stats.total),
+        f"{stats.success_rate * 100:.2f}%",
+        f"{latency.mean or 0.0:.2f}",
+        *(f"{latency.quantile(q):.0f}" if latency.count else "-" for q in (0.5, 0.9, 0.99)),
+        f"{stats.score.mean:.2f}" if stats.score.count else "-",
+        f"{stats.error_rate * 100:.2f}%",
+    ]
+
+
+def _add_summary_columns(table: Table) -> None:
     table.add_column("Tasks Run", justify="right")
     table.add_column("Success Rate", justify="right")
     table.add_column("Avg. Latency (ms)", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p90", justify="right")
+    table.add_column("p99", justify="right")
     table.add_column("Avg. Score", justify="right")
     table.add_column("Error Rate", justify="right")
 
-    agent_stats: Dict[str, Dict[str, Any]] = {}
-    for result in results_:
-        agent = result['agent']
-        if agent not in agent_stats:
-            agent_stats[agent] = {
-                'total': 0,
-                'success': 0,
-                'total_latency': 0,
-                'total_score': 0,
-                'errors': 0
-            }
-        agent_stats[agent]['total'] += 1
-        if result['success']:
-            agent_stats[agent]['success'] += 1
-            agent_stats[agent]['total_latency'] += result.get("latency_ms", -1)
-            agent_stats[agent]['total_score'] += result.get("score", 0)
-        else:
-            agent_stats[agent]['errors'] += 1
 
-    for agent, stats in agent_stats.items():
-        total_tasks = stats['total']
-        success_rate = (stats['success'] / total_tasks) * 100 if total_tasks > 0 else 0.0
-        avg_latency = stats['total_latency'] / stats['success'] if stats['success'] > 0 else 0.0
-        avg_score = stats['total_score'] / stats['success'] if stats['success'] > 0 else 0.0
-        error_rate = (stats['errors'] / total_tasks) * 100 if total_tasks > 0 else 0.0
+def generate_summary_table(aggregator: RunAggregator, run_id: str) -> Table:
+    table = Table(title="Benchmark Summary", show_header=True, header_style="bold magenta")
+    table.add_column("Run ID", style="dim")
+    table.add_column("Agent", style="dim")
+    _add_summary_columns(table)
+    for agent, stats in aggregator.agents.items():
+        table.add_row(run_id, agent, *_summary_cells(stats))
+    return table
 
-        table.add_row(
-            run_id,
-            agent,
-            str(total_tasks),
-            f"{success_rate:.2f}%",
-            f"{avg_latency:.2f}",
-            f"{avg_score:.2f}",
-            f"{error_rate:.2f}%",
-        )
+
+def generate_runs_table(summaries: List[Dict[str, Any]]) -> Table:
+    """One row per (run, agent) summary record, oldest run first."""
+    table = Table(title="Benchmark Runs", show_header=True, header_style="bold magenta")
+    table.add_column("Run ID", style="dim")
+    table.add_column("Started", style="dim")
+    table.add_column("Agent", style="cyan")
+    _add_summary_columns(table)
+    for summary in summaries:
+        started_at = summary.get("started_at")
+        started = datetime.fromtimestamp(started_at / 1000).strftime("%Y-%m-%d %H:%M") if started_at else "-"
+        table.add_row(summary["run_id"], started, summary["agent"],
+                      *_summary_cells(AgentStats.from_dict(summary["stats"])))
+    return table
+
+
+def generate_phase_table(aggregator: RunAggregator) -> Optional[Table]:
+    """Per-agent breakdown of where task time went, or None if no result has phase timings."""
+    if not any(stats.phases for stats in aggregator.agents.values()):
+        return None
+
+    table = Table(title="Phase Timings (ms)", show_header=True, header_style="bold magenta")
+    table.add_column("Agent", style="dim")
+    table.add_column("Phase")
+    table.add_column("Tasks", justify="right")
+    table.add_column("Avg.", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Max", justify="right")
+    for agent, stats in aggregator.agents.items():
+        phases = stats.phases
+        ordered = [phase for phase in PHASES if phase in phases] + sorted(set(phases) - set(PHASES))
+        for phase in ordered:
+            sketch = phases[phase]
+            table.add_row(agent, phase, str(sketch.count), f"{sketch.mean:.0f}", f"{sketch.quantile(0.5):.0f}",
+                          f"{sketch.quantile(0.95):.0f}", f"{sketch.max:.0f}")
+    return table
+
+
+def generate_domain_table(scheduler: DomainScheduler) -> Table:
+    """Queue depth, tasks in flight and latency of the busiest domains of a running run."""
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Domain", style="cyan")
+    table.add_column("Queued", justify="right")
+    table.add_column("Running", justify="right")
+    table.add_column("Done", justify="right")
+    table.add_column("p50 (s)", justify="right")
+    table.add_column("p95 (s)", justify="right")
+    domains = sorted(scheduler.stats().items(),
+                     key=lambda item: (-(item[1]["queued"] + item[1]["running"]), -item[1]["tasks"], item[0]))
+    for domain, stats in domains[:DOMAIN_TABLE_ROWS]:
+        table.add_row(domain, str(stats["queued"]),
+                      f"{stats['running']}/{stats['limit']}" if stats["limit"] else str(stats["running"]),
+                      str(stats["tasks"]),
+                      *(f"{stats[key] / 1000:.1f}" if stats[key] is not None else "-"
+                        for key in ("latency_ms_p50", "latency_ms_p95")))
+    if len(domains) > DOMAIN_TABLE_ROWS:
+        table.caption = f"{len(domains) - DOMAIN_TABLE_ROWS} more domains"
     return table
 
 
-def submit_task(task_id, agent_name, main_dep, api_keys, console, run_id, no_scoring,
+class RunView:
+    """What the run command shows while it runs: the progress bar and, once tasks are queued, their domains."""
+
+    def __init__(self, progress_: Progress):
+        self.progress = progress_
+        self.scheduler: Optional[DomainScheduler] = None
+
+    def __rich__(self):
+        if self.scheduler is None:
+            return self.progress
+        return Group(self.progress, generate_domain_table(self.scheduler))
+
+
+def print_summary(console: Console, run_id: str, aggregator: Optional[RunAggregator] = None) -> None:
+    """Prints the summary and phase tables of a run, from its stored summary if no aggregator is given."""
+    if aggregator is None:
+        aggregator = aggregator_from_summaries(get_run_summaries(run_id=run_id))
+    console.print(generate_summary_table(aggregator, run_id))
+    phase_table = generate_phase_table(aggregator)
+    if phase_table is not None:
+        console.print(phase_table)
+    schedule = (get_run_metadata(run_id) or {}).get("schedule")
+    if schedule and schedule.get("actual_makespan_ms") is not None:
+        actual = f"{_format_duration(schedule['actual_makespan_ms'])} actual ({schedule['order']} order"
+        if schedule.get("pairs_with_history") is not None:
+            actual += f", {schedule['pairs_with_history']} of {schedule['pairs']} tasks estimated from past results"
+        if schedule.get("not_predicted_with"):
+            actual += f", not predicted with {schedule['not_predicted_with']}"
+        if schedule.get("predicted_makespan_ms") is not None:
+            console.print(f"Makespan: {_format_duration(schedule['predicted_makespan_ms'])} predicted, {actual})")
+        else:
+            console.print(f"Makespan: {actual})")
+
+
+def _format_duration(ms: float) -> str:
+    if ms < 60_000:
+        return f"{ms / 1000:.1f}s"
+    seconds = round(ms / 1000)
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def _failed_result(task_id, agent_name, run_id, response: str) -> Dict[str, Any]:
+    return {"success": False, "response": response, 'task_id': task_id, 'agent': agent_name,
+            "latency_ms": -1, "timestamp": int(time.time() * 1000), "score": -1, "run_id": run_id}
+
+
+def _concurrency_label(controllers: Optional[Dict[str, AIMDController]]) -> str:
+    if not controllers:
+        return ""
+    return "parallel " + " ".join(f"{name}={controller.limit}" for name, controller in controllers.items())
+
+
+def submit_task(task_id, agent_name, main_dep, api_keys, console, run_id, scorer, controllers, browser_pool,
                 progress_, task_progress, terminate_event):
+    # With --parallel auto the scheduler took a slot from the agent's controller before starting the task.
+    controller = controllers.get(agent_name) if controllers else None
     try:
         if terminate_event.is_set():
-            return {"success": False, "response": "User interrupted.", 'task_id': task_id, 'agent': agent_name,
-                    "latency_ms": -1, "timestamp": int(time.time() * 1000), "score": -1, "run_id": run_id}
+            return _failed_result(task_id, agent_name, run_id, "User interrupted.")
 
-        if isinstance(task_id, str) and task_id.isdigit():
-            task_id = int(task_id)
         task_data = load_task_data(task_id)
-        executor = TaskExecutor(agent_name, main_dep, api_keys, task_data, run_id, no_scoring)
+        executor = TaskExecutor(agent_name, main_dep, api_keys, task_data, run_id, scorer, browser_pool)
         result = executor.run()
+        if controller is not None:
+            controller.record(result)
+
+        if not terminate_event.is_set():
+            progress_.update(task_progress, advance=1, concurrency=_concurrency_label(controllers))
+        return result
 
+    except Exception as e:
         if not terminate_event.is_set():
+            console.print(f"Error in task {task_id}: {str(e)}", style="bold red")
             progress_.update(task_progress, advance=1)
+        return _failed_result(task_id, agent_name, run_id, str(e))
+    finally:
+        if controller is not None:
+            controller.release()
+
+
+async def asubmit_task(task_id, agent_name, main_dep, api_keys, console, run_id, scorer, controllers,
+                       browser_pool, local_browsers, progress_, task_progress, terminate_event):
+    """Async counterpart of `submit_task`, used by the async execution engine."""
+    controller = controllers.get(agent_name) if controllers else None
+    try:
+        if terminate_event.is_set():
+            return _failed_result(task_id, agent_name, run_id, "User interrupted.")
+
+        task_data = load_task_data(task_id)
+        executor = TaskExecutor(agent_name, main_dep, api_keys, task_data, run_id, scorer, browser_pool,
+                                local_browsers)
+        result = await executor.arun()
+        if controller is not None:
+            controller.record(result)
+
+        if not terminate_event.is_set():
+            progress_.update(task_progress, advance=1, concurrency=_concurrency_label(controllers))
         return result
 
     except Exception as e:
         if not terminate_event.is_set():
             console.print(f"Error in task {task_id}: {str(e)}", style="bold red")
             progress_.update(task_progress, advance=1)
-        return {"success": False, "response": str(e), 'task_id': task_id, 'agent': agent_name,
-                "latency_ms": -1, "timestamp": int(time.time() * 1000), "score": -1, "run_id": run_id}
+        return _failed_result(task_id, agent_name, run_id, str(e))
+    finally:
+        if controller is not None:
+            controller.release()
+
+
+class ParallelParamType(click.ParamType):
+    """Accepts a number of parallel tasks, or `auto` for adaptive concurrency."""
+    name = "parallel"
+
+    def convert(self, value, param, ctx):
+        if value == "auto" or isinstance(value, int):
+            return value
+        try:
+            parallel = int(value)
+        except ValueError:
+            self.fail(f"{value!r} is neither 'auto' nor an integer.", param, ctx)
+        if not 1 <= parallel <= MAX_PARALLEL:
+            self.fail(f"{parallel} is not in the range 1<=x<={MAX_PARALLEL}.", param, ctx)
+        return parallel
+
+
+class ShardParamType(click.ParamType):
+    """Parses `i/N`: run the i-th of N shards (1-based)."""
+    name = "shard"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        try:
+            return parse_shard(value)
+        except ValueError as e:
+            self.fail(str(e), param, ctx)
+
+
+class RateLimitParamType(click.ParamType):
+    """Parses `PROVIDER=RPS[:MAX_IN_FLIGHT]`, or a bare number of seconds between requests to any provider."""
+    name = "rate_limit"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        provider, sep, spec = str(value).partition("=")
+        if not sep:
+            try:
+                delay = float(provider)
+            except ValueError:
+                self.fail(f"{value!r} is neither PROVIDER=RPS[:MAX_IN_FLIGHT] nor a number of seconds.", param, ctx)
+            # No bursts: every call waits the full delay after the previous one.
+            return None, 1 / delay if delay > 0 else 0, None, 1
+        if provider not in PROVIDERS:
+            self.fail(f"Unknown provider {provider!r}. Choose from: {', '.join(PROVIDERS)}.", param, ctx)
+        rate, _, max_in_flight = spec.partition(":")
+        try:
+            return provider, float(rate), int(max_in_flight) if max_in_flight else None, None
+        except ValueError:
+            self.fail(f"{value!r} is not of the form PROVIDER=RPS[:MAX_IN_FLIGHT].", param, ctx)
+
+
+class DomainLimitParamType(click.ParamType):
+    """Parses `DOMAIN=N`, or a bare `N` for every domain."""
+    name = "domain_limit"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        domain, sep, limit = str(value).rpartition("=")
+        try:
+            limit = int(limit)
+        except ValueError:
+            self.fail(f"{value!r} is neither DOMAIN=N nor a number.", param, ctx)
+        if limit < 0:
+            self.fail(f"{value!r} must not be negative.", param, ctx)
+        if sep and not domain:
+            self.fail(f"{value!r} has no domain before '='.", param, ctx)
+        return (domain_of(f"//{domain}") if sep else None), limit
+
+
+rate_limit_option = click.option(
+    "--rate-limit", "-l", type=RateLimitParamType(), multiple=True,
+    help="Limit API calls as PROVIDER=RPS[:MAX_IN_FLIGHT] (providers: raccoonai, openai, fleet). "
+         "A bare number is the minimum delay in seconds between calls to each provider. Repeatable.")
+
+
+def task_field(task_id: str, field: str) -> Any:
+    """A field of a task's data, or None if the task cannot be loaded."""
+    try:
+        return load_task_data(task_id).get(field)
+    except Exception:
+        return None
+
+
+def record_process_result(api_keys, console, run_id, scorer, progress_, task_progress, terminate_event, job,
+                          outcome) -> Dict[str, Any]:
+    """Stores a result sent back by a worker process of the process execution engine."""
+    task_id, agent_name, main_dep = job
+    try:
+        executor = TaskExecutor(agent_name, main_dep, api_keys, load_task_data(task_id), run_id, scorer)
+        if isinstance(outcome, Exception):
+            result = executor.record_error(outcome)
+            if not terminate_event.is_set():
+                console.print(f"Error in task {task_id}: {str(outcome)}", style="bold red")
+        else:
+            result = executor.record(outcome)
+    except Exception as e:
+        if not terminate_event.is_set():
+            console.print(f"Error in task {task_id}: {str(e)}", style="bold red")
+        result = _failed_result(task_id, agent_name, run_id, str(e))
+    if not terminate_event.is_set():
+        progress_.update(task_progress, advance=1)
+    return result
+
+
+def evaluator_options(f):
+    """Options shared by every command that scores results."""
+    f = click.option("--no-score-cache", is_flag=True,
+                     help="Always call the LLM instead of reusing cached scores.")(f)
+    f = click.option("--eval-base-url", help="Base URL of an OpenAI-compatible API to use for scoring.")(f)
+    f = click.option("--eval-prompt-commit", help="Pin the hub evaluation prompt to a commit hash.")(f)
+    f = click.option("--eval-prompt", type=click.Path(exists=True, dir_okay=False),
+                     help="Load the evaluation prompt from a local file instead of the LangChain hub.")(f)
+    return f
+
+
+def create_evaluator(api_key: str, eval_prompt: Optional[str], eval_prompt_commit: Optional[str],
+                     eval_base_url: Optional[str], no_score_cache: bool):
+    from .executor.evaluator import Evaluator
+    from .executor.score_cache import ScoreCache
+
+    score_cache = None if no_score_cache else ScoreCache()
+    try:
+        evaluator = Evaluator(api_key, prompt_path=eval_prompt, prompt_commit=eval_prompt_commit,
+                              base_url=eval_base_url, cache=score_cache)
+    except Exception as e:
+        raise click.ClickException(f"Failed to load the evaluation prompt: {e}")
+    return evaluator, score_cache
 
 
 @click.group(invoke_without_command=True)
@@ -188,20 +488,80 @@ def list_tasks():
 @click.option("--random", "-r", "random_tasks", type=int, default=0, help="Run a number of random tasks.")
 @click.option("--all-tasks", is_flag=True, help="Run all available tasks.")
 @click.option("--all-agents", is_flag=True, help="Run with all configured agents.")
-@click.option("--parallel", "-p", type=click.IntRange(1, 20), default=1, help="Number of tasks to run in parallel.")
-@click.option("--rate-limit", "-l", type=float, default=0.1, help="Delay between tasks (seconds).")
+@click.option("--resume", "resume_run_id", metavar="RUN_ID",
+              help="Continue an interrupted run, skipping the tasks it already finished.")
+@click.option("--shard", type=ShardParamType(), metavar="i/N",
+              help="Only run the i-th of N deterministic shards of the (task, agent) pairs. Requires --run-id.")
+@click.option("--run-id", "run_id_option", metavar="RUN_ID",
+              help="Use this run ID instead of a random one, e.g. to share it between shards.")
+@click.option("--parallel", "-p", type=ParallelParamType(), default=1,
+              help="Number of tasks to run in parallel, or 'auto' to adapt it per agent to errors and latency.")
+@click.option("--executor", "executor_", type=click.Choice(['async', 'thread', 'process']), default='async',
+              help="Run tasks on a single event loop (async), a pool of threads (thread) "
+                   "or a pool of worker processes (process).")
+@rate_limit_option
 @click.option("--no-scoring", "-ns", is_flag=True, help="Disable LLM-based scoring.")
-def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, all_agents: bool, parallel: int,
-        rate_limit: float, no_scoring: Optional[bool] = False):
+@evaluator_options
+@click.option("--scoring-concurrency", type=click.IntRange(1, 64), default=8,
+              help="Maximum number of concurrent scoring requests.")
+@click.option("--warm-browsers", type=click.IntRange(0, 64), default=2,
+              help="Number of remote browser sessions to provision ahead of the tasks that need them.")
+@click.option("--local-browsers", "local_browser_processes", type=click.IntRange(0, 32), default=2,
+              help="Number of local Chromium processes shared by local agents (async executor). 0 launches one per task.")
+@click.option("--local-browser-recycle", type=click.IntRange(1), default=25,
+              help="Replace a local Chromium process after this many tasks.")
+@click.option("--domain-limit", type=DomainLimitParamType(), multiple=True, metavar="[DOMAIN=]N",
+              help="Run at most N tasks at a time against each website, or against DOMAIN (and its subdomains). "
+                   "Tasks for other websites start meanwhile. 0 is unlimited. Repeatable.")
+@click.option("--schedule", type=click.Choice(SCHEDULES), default="lpt",
+              help="Start the longest expected tasks first, estimated from past latencies and task complexity "
+                   "(lpt), or start tasks in dataset order.")
+def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, all_agents: bool,
+        resume_run_id: Optional[str], shard: Optional[Tuple[int, int]], run_id_option: Optional[str],
+        parallel: Union[int, str], executor_: str, rate_limit: List[tuple], no_scoring: Optional[bool] = False,
+        eval_prompt: Optional[str] = None, eval_prompt_commit: Optional[str] = None,
+        eval_base_url: Optional[str] = None, no_score_cache: bool = False, scoring_concurrency: int = 8,
+        warm_browsers: int = 2, local_browser_processes: int = 2, local_browser_recycle: int = 25,
+        domain_limit: List[tuple] = (), schedule: str = "lpt"):
     """Run benchmark tasks."""
 
-    if not any([task, random_tasks, all_tasks]):
+    manifest = None
+    if resume_run_id:
+        if any([task, random_tasks, all_tasks, agent, all_agents]):
+            raise click.ClickException("--resume runs the tasks and agents of the original run; "
+                                       "do not combine it with --task, --random, --all-tasks, --agent or --all-agents.")
+        manifest = (get_run_metadata(resume_run_id) or {}).get("manifest")
+        if manifest is None:
+            raise click.ClickException(f"No manifest found for run '{resume_run_id}'. Only runs started with this "
+                                       f"version of actbench can be resumed.")
+        if shard or run_id_option:
+            raise click.ClickException("--resume continues the original run and shard; "
+                                       "do not combine it with --shard or --run-id.")
+        shard = tuple(manifest["shard"]) if manifest.get("shard") else None
+    elif not any([task, random_tasks, all_tasks]):
         raise click.ClickException("Must specify tasks to run: --task, --random, or --all-tasks.")
-    if not any([agent, all_agents]):
+    elif not any([agent, all_agents]):
         raise click.ClickException("Must specify agents: --agent or --all-agents.")
+    elif shard and not run_id_option:
+        raise click.ClickException("--shard requires --run-id, so that every shard records the same run.")
+    elif run_id_option and get_run_metadata(run_id_option):
+        raise click.ClickException(f"Run '{run_id_option}' already exists. Use --resume to continue it.")
+    if executor_ == 'thread' and parallel != 'auto' and parallel > MAX_THREAD_PARALLEL:
+        raise click.ClickException(
+            f"--executor thread supports up to {MAX_THREAD_PARALLEL} parallel tasks. Use --executor async for more.")
+    if executor_ == 'process':
+        if parallel == 'auto':
+            raise click.ClickException("--parallel auto is not supported with --executor process.")
+        if parallel > MAX_PROCESS_PARALLEL:
+            raise click.ClickException(f"--executor process supports up to {MAX_PROCESS_PARALLEL} worker processes.")
 
     task_ids_to_run = []
-    if all_tasks:
+    if manifest is not None:
+        task_ids_to_run = manifest["task_ids"]
+        no_scoring = no_scoring or not manifest["options"]["scoring"]
+        if manifest["dataset_hash"] != get_dataset_hash():
+            click.echo(f"Warning: The dataset has changed since run '{resume_run_id}' started.")
+    elif all_tasks:
         task_ids_to_run = get_all_task_ids()
     elif task:
         task_ids_to_run = list(task)
@@ -213,10 +573,17 @@ def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, a
                 f"Warning: Requested {random_tasks} random tasks, but only {len(all_task_ids)} are available.  Running all.")
             task_ids_to_run = all_task_ids
         else:
-            task_ids_to_run = random.sample(all_task_ids, random_tasks)
+            # Shards of a run must pick the same tasks, so an explicit run ID seeds the sample.
+            rng = random.Random(run_id_option) if run_id_option else random
+            task_ids_to_run = rng.sample(all_task_ids, random_tasks)
+
+    apply_rate_limits(rate_limit)
 
     api_keys = get_all_api_keys()
 
+    from langsmith.utils import LangSmithMissingAPIKeyWarning
+    warnings.filterwarnings("ignore", category=LangSmithMissingAPIKeyWarning)
+
     if not no_scoring and 'openai' not in api_keys:
         raise click.ClickException(
             "OpenAI API key is required for scoring. Use `actbench set-key --agent openai`."
@@ -238,7 +605,9 @@ def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, a
         return None
 
     agents_to_run = set()
-    if all_agents:
+    if manifest is not None:
+        agents_to_run.update(manifest["agents"])
+    elif all_agents:
         agents_to_run.update(agent_def['name'] for agent_def in AGENTS)
     else:
         agents_to_run.update(agent)
@@ -267,7 +636,101 @@ def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, a
             )
         raise click.ClickException("\n".join(error_messages))
 
-    total_tasks = len(task_ids_to_run) * len(agents_to_run)
+    # Updated as each task finishes and each score arrives, so the summary never needs the run's rows in memory.
+    aggregator = RunAggregator()
+
+    def add_scores(items: List[Dict[str, Any]], scores: List[Optional[int]]) -> None:
+        for item, score in zip(items, scores):
+            aggregator.add_score(item["agent"], item["success"], 0 if score is None else score,
+                                 item["scoring_phases"])
+
+    scorer = None
+    score_cache = None
+    if not no_scoring:
+        from .executor.scoring import ScoringPipeline
+        evaluator, score_cache = create_evaluator(api_keys['openai'], eval_prompt, eval_prompt_commit, eval_base_url,
+                                                  no_score_cache)
+        # Bounded, so results waiting to be scored do not pile up in memory when scoring falls behind.
+        scorer = ScoringPipeline(evaluator, concurrency=scoring_concurrency, max_pending=scoring_concurrency * 4,
+                                 on_scored=add_scores)
+
+    controllers = None
+    engine_parallel = parallel
+    if parallel == 'auto':
+        engine_parallel = MAX_PARALLEL if executor_ == 'async' else MAX_THREAD_PARALLEL
+        controllers = {agent_name: AIMDController(maximum=engine_parallel)
+                       for agent_name in sorted(agents_to_run) if get_agent_definition(agent_name)}
+
+    browser_pool = None
+    # Worker processes create their remote browser sessions on demand.
+    if executor_ != 'process' and any(TaskExecutor.uses_remote_browser(agent_name) for agent_name in agents_to_run):
+        from .browser import BrowserPool, FleetBrowser
+        browser_pool = BrowserPool(functools.partial(FleetBrowser, api_keys['raccoonai']), size=warm_browsers)
+
+    local_browsers = None
+    if executor_ == 'async' and local_browser_processes and any(
+            agent_name != 'raccoonai' and not TaskExecutor.uses_remote_browser(agent_name)
+            for agent_name in agents_to_run if get_agent_definition(agent_name)):
+        from .browser.local import LocalBrowserManager
+        local_browsers = LocalBrowserManager(local_browser_processes, local_browser_recycle)
+
+    # (task, agent) pairs already finished in the run being resumed. Its results still waiting for a score are
+    # handed to the scorer as they are read.
+    finished = set()
+    if manifest is not None:
+        for result in iter_results(run_id=resume_run_id):
+            finished.add((str(result["task_id"]), result["agent"]))
+            aggregator.add(result)
+            if scorer is not None and result.get("score", -1) == -1:
+                scorer.submit(resume_run_id, result["result_id"], load_task_data(result["task_id"]),
+                              load_response(result))
+
+    def is_pending(task_id_, agent_name_: str) -> bool:
+        if (str(task_id_), agent_name_) in finished:
+            return False
+        return shard is None or shard_of(str(task_id_), agent_name_, shard[1]) == shard[0]
+
+    def pending_pairs() -> Iterator[Tuple[str, str]]:
+        for task_id_ in task_ids_to_run:
+            for agent_name_ in agents_to_run:
+                if agent_name_ != "openai" and is_pending(task_id_, agent_name_):
+                    yield task_id_, agent_name_
+
+    total_tasks = sum(1 for _ in pending_pairs())
+
+    durations = None
+    ordered = None
+    if schedule == "lpt":
+        durations = DurationModel(lambda task_id_: task_field(task_id_, "complexity"))
+        for result in iter_latencies(agents_to_run):
+            durations.add(result)
+        ordered = lpt_order(pending_pairs(), durations.estimate)
+
+    def planned_pairs() -> Iterator[Tuple[str, str]]:
+        """The pending pairs in the order they are to start. Only LPT order is held in memory."""
+        return iter(ordered) if ordered is not None else pending_pairs()
+
+    schedule_stats = {"order": schedule, "pairs": total_tasks, "pairs_with_history": None,
+                      "predicted_makespan_ms": None, "actual_makespan_ms": None}
+    if durations is not None:
+        schedule_stats["pairs_with_history"] = sum(1 for pair in planned_pairs() if durations.has_history(*pair))
+        # The prediction assumes `engine_parallel` tasks run at all times, which adaptive concurrency and
+        # per-website caps do not keep to.
+        if parallel == 'auto':
+            schedule_stats["not_predicted_with"] = "--parallel auto"
+        elif domain_limit:
+            schedule_stats["not_predicted_with"] = "--domain-limit"
+        else:
+            schedule_stats["predicted_makespan_ms"] = round(predict_makespan(
+                (durations.estimate(*pair) for pair in planned_pairs()), engine_parallel))
+    max_per_domain = 0
+    domain_limits = {}
+    for domain, limit in domain_limit:
+        if domain is None:
+            max_per_domain = limit
+        else:
+            domain_limits[domain] = limit
+
     global progress
     progress = Progress(
         TextColumn("[bold blue]{task.description}"),
@@ -275,12 +738,12 @@ def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, a
         "[progress.percentage]{task.percentage:>3.1f}%",
         MofNCompleteColumn(),
         TimeElapsedColumn(),
+        TextColumn("[cyan]{task.fields[concurrency]}"),
     )
 
     console = Console()
     print_ascii(console)
-    all_results = []
-    run_id = uuid.uuid4().hex[:8]
+    run_id = resume_run_id or run_id_option or uuid.uuid4().hex[:8]
 
     terminate_event = threading.Event()
 
@@ -300,59 +763,125 @@ def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, a
 
         terminate_event.set()
 
+    scheduler = None
     original_sigint_handler = signal.signal(signal.SIGINT, handle_interrupt)
     original_sigterm_handler = signal.signal(signal.SIGTERM, handle_interrupt)
     try:
-        with Live(progress, console=console, refresh_per_second=12) as live_:
+        view = RunView(progress)
+        with Live(view, console=console, refresh_per_second=12) as live_:
             global live
             live = live_
-            task_progress = progress.add_task("Running...", total=total_tasks)
+            task_progress = progress.add_task("Running...", total=total_tasks,
+                                              concurrency=_concurrency_label(controllers))
             start_time = time.time()
-
-            with concurrent.futures.ThreadPoolExecutor(max_workers=parallel) as executor:
-
-                futures = []
-                for task_id in task_ids_to_run:
-                    if terminate_event.is_set():
-                        break
-                    for agent_name in agents_to_run:
-                        if agent_name == "openai":
-                            continue
-                        dependencies = get_all_dependencies(agent_name)
-                        main_dep = dependencies[0]
-                        future = executor.submit(submit_task, task_id, agent_name, main_dep, api_keys, console, run_id,
-                                                 no_scoring,
-                                                 progress, task_progress, terminate_event)
-                        futures.append(future)
-                        time.sleep(rate_limit)
-
-                try:
-                    completed_futures = []
-                    for future in concurrent.futures.as_completed(futures):
-                        if terminate_event.is_set():
-                            break
-                        result = future.result()
-                        all_results.append(result)
-                        completed_futures.append(future)
-                except KeyboardInterrupt:
-                    terminate_event.set()
-                    console.print("\n[bold yellow]Interrupt caught. Cleaning up...[/bold yellow]")
-
-                if terminate_event.is_set():
-                    for future in futures:
-                        if future not in completed_futures and not future.done():
-                            future.cancel()
+            options = dict(executor=executor_, parallel=parallel, rate_limits=[list(limit) for limit in rate_limit],
+                           scoring=not no_scoring, schedule=schedule,
+                           domain_limits=[list(limit) for limit in domain_limit])
+            if manifest is None:
+                save_run_metadata(run_id, started_at=int(start_time * 1000), manifest={
+                    "task_ids": task_ids_to_run, "agents": sorted(agents_to_run),
+                    "dataset_hash": get_dataset_hash(), "shard": list(shard) if shard else None,
+                    "options": options})
+            else:
+                resumes = (get_run_metadata(run_id) or {}).get("resumes", [])
+                save_run_metadata(run_id, resumes=resumes + [{"at": int(start_time * 1000), "options": options,
+                                                               "remaining": total_tasks}])
+
+            def make_job(pair: Tuple[str, str]):
+                # Jobs are made as the engine starts them, so only the running ones are held in memory.
+                task_id_, agent_name_ = pair
+                main_dep = get_all_dependencies(agent_name_)[0]
+                if executor_ == 'process':
+                    return task_id_, agent_name_, main_dep
+                if executor_ == 'async':
+                    return functools.partial(asubmit_task, task_id_, agent_name_, main_dep, api_keys, console,
+                                             run_id, scorer, controllers, browser_pool, local_browsers, progress,
+                                             task_progress, terminate_event)
+                return functools.partial(submit_task, task_id_, agent_name_, main_dep, api_keys, console, run_id,
+                                         scorer, controllers, browser_pool, progress, task_progress,
+                                         terminate_event)
+
+            def warm_browsers_for(pairs: List[Tuple[str, str]]) -> None:
+                # Called with the tasks about to start, in the order the scheduler will start them.
+                urls = (task_field(task_id_, "url") for task_id_, agent_name_ in pairs
+                        if TaskExecutor.uses_remote_browser(agent_name_))
+                browser_pool.schedule(url for url in urls if url)
+
+            # A task missing from the dataset has no domain; it fails when it runs and its error is recorded.
+            scheduler = DomainScheduler(((domain_of(task_field(pair[0], "url") or ""), pair)
+                                         for pair in planned_pairs()), max_per_domain, domain_limits, make_job,
+                                        lookahead=warm_browsers + 1,
+                                        on_upcoming=warm_browsers_for if browser_pool is not None and warm_browsers
+                                        else None,
+                                        # With --parallel auto a task only starts, and takes an engine slot, once
+                                        # its agent's controller has room for it.
+                                        group_of=lambda pair: pair[1],
+                                        try_start=(lambda agent_name_: agent_name_ not in controllers
+                                                   or controllers[agent_name_].try_acquire())
+                                        if controllers else None)
+            view.scheduler = scheduler
+
+            engine_start = time.time()
+
+            if executor_ == 'async':
+                run_async(scheduler, engine_parallel, terminate_event, aggregator.add,
+                          cleanup=local_browsers.aclose if local_browsers is not None else None)
+            elif executor_ == 'process':
+                from .executor.process import run_in_processes
+                record = functools.partial(record_process_result, api_keys, console, run_id, scorer, progress,
+                                           task_progress, terminate_event)
+                run_in_processes(scheduler, engine_parallel, api_keys, list(rate_limit), terminate_event,
+                                 lambda job_, outcome: aggregator.add(record(job_, outcome)))
+            else:
+                run_threaded(scheduler, engine_parallel, terminate_event, aggregator.add)
+            if not terminate_event.is_set():
+                schedule_stats["actual_makespan_ms"] = round((time.time() - engine_start) * 1000)
     finally:
         signal.signal(signal.SIGINT, original_sigint_handler)
         signal.signal(signal.SIGTERM, original_sigterm_handler)
+        if browser_pool is not None:
+            browser_pool.close()
+        save_run_metadata(run_id, finished_at=int(time.time() * 1000), interrupted=terminate_event.is_set(),
+                          concurrency={name: controller.stats() for name, controller in controllers.items()}
+                          if controllers else None,
+                          browser_pool=browser_pool.stats() if browser_pool is not None else None,
+                          local_browsers=local_browsers.stats() if local_browsers is not None else None,
+                          schedule=schedule_stats,
+                          domains=scheduler.stats() if scheduler is not None else None)
+        if scorer is not None:
+            if not terminate_event.is_set():
+                console.print("Waiting for scoring to finish...")
+            scorer.close(cancel=terminate_event.is_set())
+        if score_cache is not None:
+            score_cache.close()
+        writer_stats = close_result_writer(run_id)
+        save_run_metadata(run_id, writes=writer_stats)
+        if writer_stats and writer_stats["spilled"]:
+            console.print(f"{writer_stats['spilled']} result writes failed and were saved to "
+                          f"{writer_stats['spill_path']} instead.", style="bold red")
+        if terminate_event.is_set():
+            # Summarized from the results stored so far; written again when the run is resumed.
+            refresh_run_summaries(run_id)
+        else:
+            save_run_summaries(run_id, aggregator)
 
-        if not terminate_event.is_set() and all_results:
+        if not terminate_event.is_set() and aggregator.total:
             end_time = time.time()
             elapsed_time = end_time - start_time
             console.print(f"Total elapsed time: {elapsed_time:.2f} seconds")
 
-            summary_table = generate_summary_table(all_results, run_id)
-            console.print(summary_table)
+            print_summary(console, run_id, aggregator)
+            if writer_stats and writer_stats["inserted"]:
+                console.print(f"Result writes: {writer_stats['inserted']} rows in {writer_stats['batches']} batches, "
+                              f"{writer_stats['commit_ms_avg']:.0f} ms average and "
+                              f"{writer_stats['commit_ms_p95']:.0f} ms p95 from queueing to commit")
+            if score_cache is not None:
+                console.print(f"Score cache: {score_cache.hits} hits, {score_cache.misses} misses")
+            if browser_pool is not None and browser_pool.hits + browser_pool.misses:
+                pool_stats = browser_pool.stats()
+                console.print(f"Browser pool: {pool_stats['hit_rate']:.0%} hit rate, "
+                              f"{pool_stats['provision_ms_avg'] or 0:.0f} ms average provisioning, "
+                              f"{pool_stats['wait_ms_avg']:.0f} ms average wait per task")
             console.print("\n[bold green]Benchmark run completed![/bold green]")
         elif terminate_event.is_set():
             console.print("\n[bold yellow]Benchmark run was interrupted.[/bold yellow]")
@@ -360,6 +889,77 @@ def run(task: List[str], agent: List[str], random_tasks: int, all_tasks: bool, a
             console.print("\n[bold yellow]No results collected.[/bold yellow]")
 
 
+@cli.command(name="score", help="Score or re-score stored results.")
+@click.option("--run-id", "-r", help="Only score results from this run.")
+@click.option("--agent", "-a", help="Only score results from this agent.")
+@click.option("--concurrency", "-c", type=click.IntRange(1, 256), default=32,
+              help="Maximum number of concurrent scoring requests.")
+@click.option("--force", is_flag=True, help="Re-score results already scored with the same model and prompt.")
+@rate_limit_option
+@evaluator_options
+def score_results(run_id: Optional[str], agent: Optional[str], concurrency: int, force: bool,
+                  rate_limit: List[tuple], eval_prompt: Optional[str], eval_prompt_commit: Optional[str],
+                  eval_base_url: Optional[str], no_score_cache: bool):
+    """Score stored results. Results already scored with the current model and prompt version are skipped,
+    so an interrupted scoring pass can simply be started again."""
+    api_keys = get_all_api_keys()
+    if 'openai' not in api_keys:
+        raise click.ClickException("OpenAI API key is required for scoring. Use `actbench set-key --agent openai`.")
+    apply_rate_limits(rate_limit)
+
+    from langsmith.utils import LangSmithMissingAPIKeyWarning
+    warnings.filterwarnings("ignore", category=LangSmithMissingAPIKeyWarning)
+    from .executor.scoring import ScoringPipeline
+
+    console = Console()
+    evaluator, score_cache = create_evaluator(api_keys['openai'], eval_prompt, eval_prompt_commit, eval_base_url,
+                                              no_score_cache)
+    submitted, skipped, unknown = 0, 0, 0
+    scored_runs = set()
+    interrupted = False
+    with Progress(TextColumn("[bold blue]{task.description}"), BarColumn(bar_width=None), MofNCompleteColumn(),
+                  TimeElapsedColumn(), console=console) as progress_:
+        scoring_progress = progress_.add_task("Scoring...", total=None)
+        # One writer for every run the results belong to, rather than a writer thread per run.
+        scorer = ScoringPipeline(evaluator, concurrency=concurrency, max_pending=concurrency * 4,
+                                 on_scored=lambda items, _: progress_.update(scoring_progress, advance=len(items)),
+                                 writer=get_result_writer(SCORE_WRITER))
+        try:
+            for row in iter_results(run_id=run_id, agent=agent):
+                if not force and row.get("score_model") == evaluator.model_name \
+                        and row.get("score_prompt_version") == evaluator.prompt_version:
+                    skipped += 1
+                    continue
+                try:
+                    task_data = load_task_data(row['task_id'])
+                except KeyError:
+                    unknown += 1
+                    continue
+                if not row.get("result_id"):
+                    unknown += 1
+                    continue
+                scorer.submit(row['run_id'], row['result_id'], task_data, load_response(row))
+                scored_runs.add(row['run_id'])
+                submitted += 1
+                progress_.update(scoring_progress, total=submitted)
+        except KeyboardInterrupt:
+            interrupted = True
+            console.print("\n[bold yellow]Interrupted. Scores written so far are kept.[/bold yellow]")
+        finally:
+            scorer.close(cancel=interrupted)
+            close_result_writer(SCORE_WRITER)
+            for scored_run in scored_runs:
+                refresh_run_summaries(scored_run)
+            if score_cache is not None:
+                score_cache.close()
+
+    console.print(f"Scored {submitted} results with {evaluator.model_name} (prompt {evaluator.prompt_version}), "
+                  f"skipped {skipped} already scored.")
+    if unknown:
+        console.print(f"{unknown} results could not be scored: their task is not in the dataset or they have no "
+                      f"result id.", style="yellow")
+
+
 @cli.command(name="set-key", help="Set an API key for an agent.")
 @click.option('--agent', '-a', required=True, help='Agent name (e.g., raccoonai).')
 def set_key(agent):
@@ -374,20 +974,56 @@ def results():
     pass
 
 
+def _preview(response: Any, width: int = RESPONSE_PREVIEW_CHARS) -> str:
+    """A response as one line of at most `width` characters; `width=0` keeps the whole response."""
+    if response is None or response == "":
+        return 'N/A'
+    text = response if isinstance(response, str) else json.dumps(response, default=str)
+    if not width:
+        return text
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
 @results.command(name="list", help="List benchmark results.")
 @click.option("--agent", "-a", required=False, help="Filter results by agent.")
 @click.option("--run-id", "-r", required=False, help="Filter results by run ID.")
-def list_results(agent: Optional[str] = None, run_id: Optional[str] = None):
-    if agent:
-        all_results = get_results_by_agent(agent)
-    elif run_id:
-        all_results = get_results_by_run_id(run_id)
-    else:
-        all_results = get_all_results()
+@click.option("--task", "-t", "task_id", help="Filter results by task ID.")
+@click.option("--success/--failed", default=None, help="Only show successful or only failed results.")
+@click.option("--since", type=click.DateTime(formats=DATE_FORMATS), help="Only show results recorded since this date.")
+@click.option("--sort", type=click.Choice(sorted(LIST_SORT_KEYS)),
+              help="Sort by timestamp, latency or score; prefix with '-' for descending. Defaults to storage order.")
+@click.option("--limit", "-n", type=click.IntRange(min=1),
+              help=f"Maximum number of results to show. Defaults to {LIST_PAGE_SIZE}, or all with --jsonl.")
+@click.option("--offset", type=click.IntRange(min=0), default=0, help="Number of matching results to skip.")
+@click.option("--full", is_flag=True,
+              help="Show whole responses, loading those kept in the blob store, instead of a one-line preview.")
+@click.option("--jsonl", "as_jsonl", is_flag=True, help="Print matching results as JSON lines, e.g. for piping.")
+def list_results(agent: Optional[str], run_id: Optional[str], task_id: Optional[str], success: Optional[bool],
+                 since: Optional[datetime], sort: Optional[str], limit: Optional[int], offset: int, full: bool,
+                 as_jsonl: bool):
+    """Pages through stored results. Filters, sorting and paging are applied by the storage backend, so only
+    the rows shown are read into memory. Large responses are only loaded from the blob store with --full."""
+    filters = dict(run_id=run_id, agent=agent, task_id=task_id, success=success,
+                   since=int(since.timestamp() * 1000) if since else None, offset=offset)
+    if sort:
+        filters.update(sort=LIST_SORT_KEYS[sort], descending=sort.startswith("-"))
+
+    if as_jsonl:
+        rows = search_results(limit=limit, **filters)
+        for row in load_responses(rows) if full else rows:
+            click.echo(json.dumps(row, default=str))
+        return
 
     console = Console()
-
-    if not all_results:
+    page_size = limit or LIST_PAGE_SIZE
+    # One row past the page tells whether there is a next page.
+    rows = list(search_results(limit=page_size + 1, **filters))
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if full:
+        rows = list(load_responses(rows))
+    if not rows:
         console.print("No results found.", style="yellow")
         return
 
@@ -401,7 +1037,7 @@ def list_results(agent: Optional[str] = None, run_id: Optional[str] = None):
     table.add_column("Score", justify="right")
     table.add_column("Response", style="green")
 
-    for row in all_results:
+    for row in rows:
         table.add_row(
             row['run_id'],
             str(row['task_id']),
@@ -410,44 +1046,86 @@ def list_results(agent: Optional[str] = None, run_id: Optional[str] = None):
             "[green]Yes[/green]" if row['success'] else "[red]No[/red]",
             str(row['latency_ms']),
             str(row['score']),
-            row['response'] if row['response'] else 'N/A'
+            escape(_preview(row['response'], 0 if full else RESPONSE_PREVIEW_CHARS))
         )
 
     console.print(table)
+    shown = f"Showing results {offset + 1}-{offset + len(rows)}."
+    if has_more:
+        shown += f" Use --offset {offset + len(rows)} for more."
+    console.print(shown, style="dim")
 
 
 @results.command(name="export", help="Export results to a file.")
 @click.option("--agent", "-a", help="Filter results by agent.")
 @click.option("--run-id", "-r", help="Filter results by run ID.")
-@click.option("--format", "-f", "format_", type=click.Choice(['json', 'csv']), default='json', help="Export format.")
+@click.option("--format", "-f", "format_", type=click.Choice(EXPORT_FORMATS), default='json', help="Export format.")
 @click.option("--output", "-o", required=True, type=click.Path(), help="Output file path.")
-def export_results(agent: Optional[str], run_id: Optional[str], format_: str, output: str):
+@click.option("--previews", is_flag=True,
+              help="Export the previews and blob references of large responses instead of loading them.")
+def export_results(agent: Optional[str], run_id: Optional[str], format_: str, output: str, previews: bool):
     console = Console()
-    if agent:
-        results_ = get_results_by_agent(agent)
-    elif run_id:
-        results_ = get_results_by_run_id(run_id)
-    else:
-        results_ = get_all_results()
-
-    if not results_:
+    rows = iter_results(run_id=run_id, agent=agent)
+    try:
+        count = write_export(rows if previews else load_responses(rows), output, format_)
+    except Exception as e:
+        console.print(f"Error exporting results: {e}", style="red")
+        return
+    if not count:
+        os.remove(output)
         console.print("No results to export.", style="yellow")
         return
+    console.print(f"Exported {count} results to [bold]{output}[/bold] in {format_} format.", style="green")
+
+
+@results.command(name="summary", help="Summarize past runs.")
+@click.option("--run-id", "-r", help="Show the full summary of one run.")
+@click.option("--agent", "-a", help="Only show this agent.")
+@click.option("--since", type=click.DateTime(formats=DATE_FORMATS), help="Only show runs started on or after this date.")
+@click.option("--until", type=click.DateTime(formats=DATE_FORMATS), help="Only show runs started before this date.")
+def summarize_results(run_id: Optional[str], agent: Optional[str], since: Optional[datetime],
+                      until: Optional[datetime]):
+    """Lists runs from their stored per-agent summaries, so no run's results have to be read. Runs recorded
+    before summaries existed are summarized once, when the results database is upgraded or imported into."""
+    console = Console()
+    summaries = get_run_summaries(run_id=run_id, agent=agent,
+                                  since=int(since.timestamp() * 1000) if since else None,
+                                  until=int(until.timestamp() * 1000) if until else None)
+    if not summaries:
+        console.print("No results found.", style="yellow")
+        return
+    if run_id:
+        print_summary(console, run_id, aggregator_from_summaries(summaries))
+    else:
+        console.print(generate_runs_table(summaries))
 
+
+@results.command(name="merge", help="Merge a run's results from per-shard result stores.")
+@click.option("--run-id", "-r", required=True, help="The run ID shared by the shards.")
+@click.argument("stores", nargs=-1, required=True, type=click.Path(exists=True))
+def merge_results(run_id: str, stores: List[str]):
+    """Merges the results of a sharded run into the configured storage. Each store is a `results.db` file
+    or a jsonl `results` directory copied from one shard."""
+    console = Console()
     try:
-        if format_ == 'json':
-            with open(output, 'w') as f:
-                json.dump(results_, f, indent=2)
-        elif format_ == 'csv':
-            with open(output, 'w') as f:
-                if results_:
-                    header = list(results_[0].keys())
-                    f.write(','.join(header) + '\n')
-                    for row in results_:
-                        f.write(','.join(str(row[key]) for key in header) + '\n')
-        console.print(f"Results exported to [bold]{output}[/bold] in {format_} format.", style="green")
-    except Exception as e:
-        console.print(f"Error exporting results: {e}", style="red")
+        stats = merge_run(run_id, list(stores))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    console.print(f"Merged {stats['inserted']} results into run {run_id} "
+                  f"({stats['duplicates']} duplicates skipped).", style="green")
+    if stats["missing_shards"]:
+        console.print(f"Missing shards: {', '.join(map(str, stats['missing_shards']))}", style="yellow")
+    print_summary(console, run_id)
+
+
+@results.command(name="import", help="Import legacy JSON results into the results database.")
+def import_results():
+    console = Console()
+    try:
+        imported = import_legacy_results()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    console.print(f"Imported {imported} results.", style="green")
 
 
 @cli.group(name="agents", help="View agents and API keys..")
@@ -1,15 +1,20 @@
+import importlib
+
 from .base import BaseClient
-from .raccoonai import RaccoonAIClient
+
+# Agent name -> (module, class). Clients are imported on first use so that their SDKs
+# only load when an agent actually runs.
+_CLIENT_REGISTRY = {
+    "raccoonai": ("actbench.clients.raccoonai", "RaccoonAIClient"),
+    "browseruse": ("actbench.clients.browseruse", "BrowserUseClient"),
+    "browseruse-local": ("actbench.clients.browseruse", "BrowserUseClient"),
+}
 
 
 def get_agent_client(agent_name: str) -> BaseClient:
-    from actbench.clients.browseruse import BrowserUseClient
-    _CLIENT_REGISTRY = {
-        "raccoonai": RaccoonAIClient,
-        "browseruse": BrowserUseClient,
-        "browseruse-local": BrowserUseClient,
-    }
-    client_class = _CLIENT_REGISTRY.get(agent_name.lower())
-    if client_class is None:
+    entry = _CLIENT_REGISTRY.get(agent_name.lower())
+    if entry is None:
         raise ValueError(f"Unsupported agent: {agent_name}")
+    module_name, class_name = entry
+    client_class = getattr(importlib.import_module(module_name), class_name)
     return client_class()
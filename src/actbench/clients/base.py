@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 
@@ -13,3 +14,6 @@ class BaseClient(ABC):
     def run(self, task_data: Dict[str, Any], browser: Optional[BaseBrowser] = None) -> Dict[str, Any]:
         pass
 
+    async def arun(self, task_data: Dict[str, Any], browser: Optional[BaseBrowser] = None) -> Dict[str, Any]:
+        """Runs the task from an event loop. Clients without native async support run `run` on a worker thread."""
+        return await asyncio.to_thread(self.run, task_data, browser)
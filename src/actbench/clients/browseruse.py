@@ -1,13 +1,15 @@
 import asyncio
 import os
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 
 from browser_use import Agent
 from browser_use.browser.browser import Browser, BrowserConfig
 from langchain_openai import ChatOpenAI
 
 from ..browser import BaseBrowser
+from ..browser.local import LocalBrowser
+from ..ratelimit.langchain import ProviderRateLimiter
 from .base import BaseClient
 
 
@@ -21,24 +23,32 @@ class BrowserUseClient(BaseClient):
         self.api_key = api_key
 
     def run(self, task_data: Dict[str, Any], browser: Optional[BaseBrowser] = None) -> Dict[str, Any]:
+        return asyncio.run(self.arun(task_data, browser))
+
+    async def arun(self, task_data: Dict[str, Any],
+                   browser: Optional[Union[BaseBrowser, LocalBrowser]] = None) -> Dict[str, Any]:
         start_time = time.time()
         browseruse_browser = None
+        browser_context = None
         agent_name = 'browseruse-local'
         try:
-            if browser:
+            if isinstance(browser, LocalBrowser):
+                browser_context = await browser.new_context()
+            elif browser:
                 agent_name = 'browseruse'
-                cdp_url = browser.get_cdp_url(task_data["url"])
+                cdp_url = await browser.aget_cdp_url(task_data["url"])
                 browseruse_browser = Browser(config=BrowserConfig(cdp_url=cdp_url))
             agent = Agent(
                 task=task_data["query"],
-                llm=ChatOpenAI(api_key=self.api_key, model="gpt-4o"),
+                llm=ChatOpenAI(api_key=self.api_key, model="gpt-4o", rate_limiter=ProviderRateLimiter("openai")),
                 generate_gif=False,
                 browser=browseruse_browser,
+                browser_context=browser_context,
             )
 
-            result = asyncio.run(agent.run(20))
+            result = await agent.run(20)
             if browser:
-                browser.terminate()
+                await browser.aterminate()
 
             result_json = result.model_dump()
             history = result_json.get("history", [])
@@ -1,45 +1,48 @@
 import time
 from typing import Dict, Any, Optional
 
-from raccoonai import RaccoonAI
+from raccoonai import RaccoonAI, AsyncRaccoonAI
 from raccoonai.types import lam_run_params
 
 from .base import BaseClient
 from ..browser import BaseBrowser
+from ..ratelimit import get_rate_limiter
+
+
+# One async client per API key, shared by the client instances of all tasks so that they reuse its connections.
+# The async engine runs every task on one event loop.
+_ASYNC_CLIENTS: Dict[str, AsyncRaccoonAI] = {}
 
 
 class RaccoonAIClient(BaseClient):
     def __init__(self):
         self.api_key = None
         self.client = None
+        self.async_client = None
 
     def set_api_key(self, api_key: str) -> None:
         self.api_key = api_key
         if self.client is None:
             self.client = RaccoonAI(secret_key=self.api_key)
+        if self.async_client is None:
+            if api_key not in _ASYNC_CLIENTS:
+                _ASYNC_CLIENTS[api_key] = AsyncRaccoonAI(secret_key=api_key)
+            self.async_client = _ASYNC_CLIENTS[api_key]
 
-    def run(self, task_data: Dict[str, Any], browser: Optional[BaseBrowser] = None) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            response = self.client.lam.run(
-                query=task_data["query"],
-                raccoon_passcode="actbench",
-                app_url=task_data["url"],
-                advanced=lam_run_params.Advanced(
-                    block_ads=True,
-                    solve_captchas=True,
-                )
+    @staticmethod
+    def _run_params(task_data: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(
+            query=task_data["query"],
+            raccoon_passcode="actbench",
+            app_url=task_data["url"],
+            advanced=lam_run_params.Advanced(
+                block_ads=True,
+                solve_captchas=True,
             )
-            end_time = time.time()
-        except Exception as e:
-            return {
-                "task_id": task_data['task_id'],
-                "agent": "raccoonai",
-                "latency_ms": -1,
-                "success": False,
-                "response": f"Unexpected error: {str(e)}",
-            }
+        )
 
+    @staticmethod
+    def _to_result(task_data: Dict[str, Any], response, start_time: float, end_time: float) -> Dict[str, Any]:
         return {
             "task_id": task_data['task_id'],
             "agent": "raccoonai",
@@ -47,3 +50,33 @@ class RaccoonAIClient(BaseClient):
             "success": response.task_status == 'DONE',
             "response": response.model_dump()
         }
+
+    @staticmethod
+    def _to_error(task_data: Dict[str, Any], e: Exception) -> Dict[str, Any]:
+        return {
+            "task_id": task_data['task_id'],
+            "agent": "raccoonai",
+            "latency_ms": -1,
+            "success": False,
+            "response": f"Unexpected error: {str(e)}",
+        }
+
+    def run(self, task_data: Dict[str, Any], browser: Optional[BaseBrowser] = None) -> Dict[str, Any]:
+        try:
+            with get_rate_limiter("raccoonai").limit():
+                start_time = time.time()
+                response = self.client.lam.run(**self._run_params(task_data))
+                end_time = time.time()
+        except Exception as e:
+            return self._to_error(task_data, e)
+        return self._to_result(task_data, response, start_time, end_time)
+
+    async def arun(self, task_data: Dict[str, Any], browser: Optional[BaseBrowser] = None) -> Dict[str, Any]:
+        try:
+            async with get_rate_limiter("raccoonai").alimit():
+                start_time = time.time()
+                response = await self.async_client.lam.run(**self._run_params(task_data))
+                end_time = time.time()
+        except Exception as e:
+            return self._to_error(task_data, e)
+        return self._to_result(task_data, response, start_time, end_time)
@@ -1,8 +1,7 @@
 import logging
 import os
-from typing import Dict, Any, List
-
-import requests
+import threading
+from typing import Dict, Any, List, Optional
 
 from .base import BaseDataset
 from .json import JsonDataset
@@ -10,9 +9,14 @@ from .json import JsonDataset
 DATASET_URL = "https://raw.githubusercontent.com/raccoonaihq/actbench/master/dataset.jsonl"
 LOCAL_DATASET_PATH = "dataset.jsonl"
 
+_DATASET_INSTANCE: Optional[BaseDataset] = None
+_DATASET_LOCK = threading.Lock()
+
 
 def download_dataset():
     if not os.path.exists(LOCAL_DATASET_PATH):
+        import requests
+
         response = requests.get(DATASET_URL)
         if response.status_code == 200:
             with open(LOCAL_DATASET_PATH, "w", encoding="utf-8") as file:
@@ -21,18 +25,30 @@ def download_dataset():
             logging.error(f"Failed to download dataset: HTTP {response.status_code}")
 
 
-download_dataset()
-
-_DATASET_INSTANCE: BaseDataset = JsonDataset(LOCAL_DATASET_PATH)
+def get_dataset() -> BaseDataset:
+    """Returns the shared dataset, downloading it on first use if it is not present locally."""
+    global _DATASET_INSTANCE
+    with _DATASET_LOCK:
+        if _DATASET_INSTANCE is None:
+            try:
+                download_dataset()
+            except Exception as e:
+                logging.error(f"Failed to download dataset: {e}")
+            _DATASET_INSTANCE = JsonDataset(LOCAL_DATASET_PATH)
+        return _DATASET_INSTANCE
 
 
 def load_task_data(task_id: str | int) -> Dict[str, Any]:
-    return _DATASET_INSTANCE.load_task_data(task_id)
+    return get_dataset().load_task_data(task_id)
 
 
 def get_all_task_ids() -> List[str]:
-    return _DATASET_INSTANCE.get_all_task_ids()
+    return get_dataset().get_all_task_ids()
 
 
 def get_all_tasks() -> List[Dict[str, Any]]:
-    return _DATASET_INSTANCE.get_all_tasks()
+    return get_dataset().get_all_tasks()
+
+
+def get_dataset_hash() -> str:
+    return get_dataset().get_hash()
@@ -1,3 +1,5 @@
+import hashlib
+import json
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 
@@ -17,3 +19,8 @@ class BaseDataset(ABC):
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """Returns a list of all available tasks."""
         pass
+
+    def get_hash(self) -> str:
+        """Returns a hash of the dataset's contents, to tell whether two runs used the same tasks."""
+        content = json.dumps(self.get_all_tasks(), sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
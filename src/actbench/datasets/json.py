@@ -1,43 +1,70 @@
+import hashlib
 import json
-from typing import Dict, Any, List
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
 from .base import BaseDataset
 
 
 class JsonDataset(BaseDataset):
     def __init__(self, dataset_path: str):
         self.dataset_path = dataset_path
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._hash: Optional[str] = None
 
-    def load_task_data(self, task_id: str | int) -> Dict[str, Any]:
+    def _get_index(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the task id -> task map, rebuilding it when the file's mtime or size has changed.
+
+        Task ids are keyed by their string form, so `256` and `"256"` resolve to the same task.
+        """
         try:
-            with open(self.dataset_path, 'r') as f:
-                for line in f:
-                    task = json.loads(line)
-                    if task["task_id"] == task_id:
-                        return task
-                raise KeyError(f"Task ID '{task_id}' not found in '{self.dataset_path}'")
+            stat = os.stat(self.dataset_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Dataset file not found: {self.dataset_path}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid JSON in dataset file: {self.dataset_path}")
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if signature != self._signature:
+                index = {}
+                try:
+                    with open(self.dataset_path, 'r') as f:
+                        for line in f:
+                            if not line.strip():
+                                continue
+                            task = json.loads(line)
+                            index.setdefault(str(task["task_id"]), task)
+                except json.JSONDecodeError:
+                    raise ValueError(f"Invalid JSON in dataset file: {self.dataset_path}")
+                self._index = index
+                self._signature = signature
+                self._hash = None
+            return self._index
+
+    def load_task_data(self, task_id: str | int) -> Dict[str, Any]:
+        task = self._get_index().get(str(task_id))
+        if task is None:
+            raise KeyError(f"Task ID '{task_id}' not found in '{self.dataset_path}'")
+        return dict(task)
 
     def get_all_task_ids(self) -> List[str]:
-        task_ids = []
         try:
-            with open(self.dataset_path, 'r') as f:
-                for line in f:
-                    task = json.loads(line)
-                    task_ids.append(task["task_id"])
-        except (FileNotFoundError, json.JSONDecodeError):
+            return [task["task_id"] for task in self._get_index().values()]
+        except (FileNotFoundError, ValueError):
             return []
-        return task_ids
 
     def get_all_tasks(self) -> List[Dict[str, Any]]:
-        tasks = []
         try:
-            with open(self.dataset_path, 'r') as f:
-                for line in f:
-                    task = json.loads(line)
-                    tasks.append(task)
-        except (FileNotFoundError, json.JSONDecodeError):
+            return [dict(task) for task in self._get_index().values()]
+        except (FileNotFoundError, ValueError):
             return []
-        return tasks
+
+    def get_hash(self) -> str:
+        self._get_index()
+        with self._lock:
+            if self._hash is None:
+                with open(self.dataset_path, 'rb') as f:
+                    self._hash = hashlib.sha256(f.read()).hexdigest()
+            return self._hash
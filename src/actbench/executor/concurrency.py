@@ -0,0 +1,99 @@
+import re
+import statistics
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# Errors that mean the provider is overloaded rather than that the agent failed the task.
+THROTTLE_PATTERN = re.compile(
+    r"\b(429|50[0-4])\b|rate.?limit|too many requests|overloaded|timed? ?out|timeout", re.IGNORECASE)
+
+
+def is_throttled(result: Dict[str, Any]) -> bool:
+    """Returns True for failed results caused by throttling, server errors or timeouts."""
+    return not result.get("success") and bool(THROTTLE_PATTERN.search(str(result.get("response"))))
+
+
+class AIMDController:
+    """Adaptive limit on the number of tasks in flight, using additive increase / multiplicative decrease.
+
+    After every window of `limit` completions the limit grows by `increase` if the window was healthy, or is
+    multiplied by `decrease` if too many results were throttled or the median latency rose above
+    `latency_tolerance` times the best median seen so far. A throttled result also cuts the limit right away,
+    at most once per window, so a burst of 429s halves concurrency once rather than collapsing it.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 1000, increase: int = 1,
+                 decrease: float = 0.5, max_error_rate: float = 0.1, latency_tolerance: float = 2.0):
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.max_error_rate = max_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.history: List[Tuple[float, int]] = [(time.time(), self.limit)]
+        self._in_flight = 0
+        self._completed = 0
+        self._throttled = 0
+        self._latencies: List[int] = []
+        self._since_cut: Optional[int] = None
+        self._baseline_latency: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _set_limit(self, limit: int) -> None:
+        limit = max(self.minimum, min(limit, self.maximum))
+        if limit != self.limit:
+            self.limit = limit
+            self.history.append((time.time(), limit))
+        self._completed = 0
+        self._throttled = 0
+        self._latencies = []
+
+    def _cut(self) -> None:
+        self._since_cut = 0
+        self._set_limit(int(self.limit * self.decrease))
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """Feeds a finished task's result into the controller."""
+        throttled = is_throttled(result)
+        with self._lock:
+            self._completed += 1
+            if self._since_cut is not None:
+                self._since_cut += 1
+            if throttled:
+                self._throttled += 1
+            elif result.get("latency_ms", -1) > 0:
+                self._latencies.append(result["latency_ms"])
+
+            if throttled and (self._since_cut is None or self._since_cut >= self.limit):
+                self._cut()
+            elif self._completed >= self.limit:
+                latency = statistics.median(self._latencies) if self._latencies else None
+                too_slow = (latency is not None and self._baseline_latency is not None
+                            and latency > self._baseline_latency * self.latency_tolerance)
+                if latency is not None:
+                    self._baseline_latency = latency if self._baseline_latency is None \
+                        else min(self._baseline_latency, latency)
+                if self._throttled / self._completed > self.max_error_rate or too_slow:
+                    self._cut()
+                else:
+                    self._set_limit(self.limit + self.increase)
+
+    def try_acquire(self) -> bool:
+        """Takes a slot for a task if one is free. Returns False, without waiting, if the limit is reached.
+        A successful call must be paired with `release`."""
+        with self._lock:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary suitable for the run metadata."""
+        limits = [limit for _, limit in self.history]
+        return {"final": self.limit, "min": min(limits), "max": max(limits), "history": self.history}
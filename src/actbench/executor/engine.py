@@ -0,0 +1,98 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional, Union
+
+ResultCallback = Callable[[Dict[str, Any]], None]
+
+
+class JobQueue:
+    """The jobs of a run, handed to an engine one at a time as it has room for them.
+
+    Engines call `next` whenever a slot frees up and `done` when a job they took finishes. This base class
+    hands out jobs in order; subclasses may hold jobs back (see `scheduling.DomainScheduler`), in which case
+    `next` returns None until a running job is `done`.
+    """
+
+    def __init__(self, jobs: Iterable[Any]):
+        self._jobs = iter(jobs)
+
+    def next(self) -> Optional[Any]:
+        """Returns the job to start next, or None if there is none to start now."""
+        return next(self._jobs, None)
+
+    def done(self, job: Any) -> None:
+        """Reports that a job returned by `next` finished."""
+        pass
+
+
+def as_job_queue(jobs: Union[JobQueue, Iterable[Any]]) -> JobQueue:
+    return jobs if isinstance(jobs, JobQueue) else JobQueue(jobs)
+
+
+def run_threaded(jobs: Union[JobQueue, Iterable[Callable[[], Dict[str, Any]]]], parallel: int,
+                 terminate_event: threading.Event, on_result: ResultCallback) -> None:
+    """Runs blocking jobs on a pool of `parallel` threads, calling `on_result` from this thread as each finishes."""
+    jobs = as_job_queue(jobs)
+    running: Dict[concurrent.futures.Future, Any] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=parallel) as executor:
+        try:
+            while not terminate_event.is_set():
+                while len(running) < parallel:
+                    job = jobs.next()
+                    if job is None:
+                        break
+                    running[executor.submit(job)] = job
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, timeout=0.5,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    jobs.done(running.pop(future))
+                    on_result(future.result())
+        except KeyboardInterrupt:
+            terminate_event.set()
+
+
+def run_async(jobs: Union[JobQueue, Iterable[Callable[[], Awaitable[Dict[str, Any]]]]], parallel: int,
+              terminate_event: threading.Event, on_result: ResultCallback,
+              cleanup: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+    """Runs coroutine jobs on a single event loop with at most `parallel` in flight.
+
+    Jobs still running when `terminate_event` is set are cancelled. `cleanup` is awaited on the same loop once
+    all jobs are done, for resources bound to it.
+    """
+    asyncio.run(_run_async(as_job_queue(jobs), parallel, terminate_event, on_result, cleanup))
+
+
+async def _run_async(jobs: JobQueue, parallel: int, terminate_event: threading.Event, on_result: ResultCallback,
+                     cleanup: Optional[Callable[[], Awaitable[None]]]) -> None:
+    try:
+        await _run_jobs(jobs, parallel, terminate_event, on_result)
+    finally:
+        if cleanup is not None:
+            await cleanup()
+
+
+async def _run_jobs(jobs: JobQueue, parallel: int, terminate_event: threading.Event,
+                    on_result: ResultCallback) -> None:
+    running: Dict[asyncio.Task, Any] = {}
+    while not terminate_event.is_set():
+        while len(running) < parallel:
+            job = jobs.next()
+            if job is None:
+                break
+            running[asyncio.create_task(job())] = job
+        if not running:
+            break
+        # The timeout keeps the loop responsive to `terminate_event`, which is set from a signal handler.
+        done, _ = await asyncio.wait(running, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            jobs.done(running.pop(task))
+            if not task.cancelled() and task.exception() is None:
+                on_result(task.result())
+
+    if running:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
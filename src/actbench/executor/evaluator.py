@@ -1,38 +1,148 @@
+import hashlib
 import json
 import logging
-from typing import Dict, Any, Union
+import os
+from typing import Dict, Any, List, Union, Optional, Tuple
 
-from langchain import hub
+from langchain_core.load import dumpd, load
 from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import BasePromptTemplate, ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 
+from .score_cache import ScoreCache
+from ..ratelimit import get_rate_limiter
+
+EVAL_PROMPT = "raccoonai/actbench-llm-eval-prompt"
+PROMPT_CACHE_DIR = os.path.join("cache", "prompts")
+
+
+def _load_prompt_file(prompt_path: str) -> Tuple[BasePromptTemplate, str]:
+    with open(prompt_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    version = "file-" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    if prompt_path.endswith(".json"):
+        return load(json.loads(content)), version
+    return ChatPromptTemplate.from_template(content), version
+
+
+# The latest hub prompt, pulled once per process since it can change on the hub at any time.
+_LATEST_PROMPT: Optional[BasePromptTemplate] = None
+
+
+def _prompt_cache_file(commit: str) -> str:
+    return os.path.join(PROMPT_CACHE_DIR, f"{EVAL_PROMPT.split('/')[-1]}-{commit}.json")
+
+
+def _pull_prompt(commit: Optional[str]) -> BasePromptTemplate:
+    from langchain import hub
+
+    prompt = hub.pull(f"{EVAL_PROMPT}:{commit}" if commit else EVAL_PROMPT)
+    pulled_commit = commit or (prompt.metadata or {}).get("lc_hub_commit_hash")
+    if pulled_commit:
+        os.makedirs(PROMPT_CACHE_DIR, exist_ok=True)
+        with open(_prompt_cache_file(pulled_commit), "w", encoding="utf-8") as f:
+            json.dump(dumpd(prompt), f, indent=2)
+    return prompt
+
+
+def load_eval_prompt(prompt_path: Optional[str] = None,
+                     commit: Optional[str] = None) -> Tuple[BasePromptTemplate, str]:
+    """Returns the evaluation prompt and its version.
+
+    A local `prompt_path` (a serialized LangChain prompt as `.json`, or a plain template) takes precedence.
+    Otherwise a pinned `commit` of the hub prompt is pulled once and cached under `cache/prompts/`; without
+    one the latest prompt is pulled once per process. The version is the prompt's hub commit hash.
+    """
+    global _LATEST_PROMPT
+    if prompt_path:
+        return _load_prompt_file(prompt_path)
+
+    if commit is None:
+        if _LATEST_PROMPT is None:
+            _LATEST_PROMPT = _pull_prompt(None)
+        prompt = _LATEST_PROMPT
+    elif os.path.exists(_prompt_cache_file(commit)):
+        with open(_prompt_cache_file(commit), "r", encoding="utf-8") as f:
+            prompt = load(json.load(f))
+    else:
+        prompt = _pull_prompt(commit)
+
+    version = (prompt.metadata or {}).get("lc_hub_commit_hash") or commit or "latest"
+    return prompt, version
+
 
 class Evaluator:
-    """Evaluates the agent's response and calculates the final score."""
+    """Evaluates the agent's response and calculates the final score.
 
-    def __init__(self, api_key: str = None, model_name: str = "gpt-4o-mini", temperature: float = 0.2):
-        self.llm = ChatOpenAI(openai_api_key=api_key, model_name=model_name, temperature=temperature)
-        self.prompt_template = hub.pull("raccoonai/actbench-llm-eval-prompt")
+    A single instance is meant to be shared by every worker in a run: the prompt is loaded once
+    and all calls go through the same `ChatOpenAI` client and its connection pool.
+    """
 
-    def _get_llm_score(self, query: str, complexity: str, requires_login: bool,
-                       response: Union[str, Dict[str, Any]]) -> float:
-        chain = self.prompt_template | self.llm | JsonOutputParser()
+    def __init__(self, api_key: str = None, model_name: str = "gpt-4o-mini", temperature: float = 0.2,
+                 prompt_path: Optional[str] = None, prompt_commit: Optional[str] = None,
+                 base_url: Optional[str] = None, cache: Optional[ScoreCache] = None):
+        self.cache = cache
+        self.model_name = model_name
+        self.temperature = temperature
+        self.llm = ChatOpenAI(openai_api_key=api_key, model_name=model_name, temperature=temperature,
+                              base_url=base_url)
+        self.prompt_template, self.prompt_version = load_eval_prompt(prompt_path, prompt_commit)
+        self.chain = self.prompt_template | self.llm | JsonOutputParser()
+        self.limited_chain = RunnableLambda(self._invoke_limited)
+
+    def _invoke_limited(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        with get_rate_limiter("openai").limit():
+            return self.chain.invoke(inputs)
+
+    @staticmethod
+    def _build_input(query: str, complexity: str, requires_login: bool,
+                     response: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "response": json.dumps(response) if isinstance(response, dict) else response,
+            "complexity": complexity,
+            "requires_login": requires_login
+        }
+
+    @staticmethod
+    def _parse_llm_score(llm_response: Union[Dict[str, Any], Exception]) -> Optional[float]:
+        """Returns the averaged score, or None when the evaluation failed."""
         try:
-            llm_response = chain.invoke(
-                input={
-                    "query": query,
-                    "response": json.dumps(response) if isinstance(response, dict) else response,
-                    "complexity": complexity,
-                    "requires_login": requires_login
-                }
-            )
+            if isinstance(llm_response, Exception):
+                raise llm_response
             avg_llm_score = (
                     (llm_response["relevance"] + llm_response["completeness"] + llm_response["helpfulness"]) / 3 * 10
             )
             return avg_llm_score
         except Exception as e:
             logging.error(f"LLM evaluation failed: {e}")
+            return None
+
+    def _cache_key(self, query: str, complexity: str, requires_login: bool,
+                   response: Union[str, Dict[str, Any]]) -> str:
+        return ScoreCache.make_key(query, complexity, requires_login, response, self.model_name, self.temperature,
+                                   self.prompt_version)
+
+    def _get_llm_score(self, query: str, complexity: str, requires_login: bool,
+                       response: Union[str, Dict[str, Any]]) -> float:
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(query, complexity, requires_login, response)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            llm_response = self._invoke_limited(self._build_input(query, complexity, requires_login, response))
+        except Exception as e:
+            llm_response = e
+        score = self._parse_llm_score(llm_response)
+        if score is None:
             return 0.0
+        if key is not None:
+            self.cache.put(key, int(score))
+        return score
 
     def calculate_score(self, query: str, complexity: str, requires_login: bool, response: Union[str, Dict[str, Any]],
                         success: bool) -> int:
@@ -40,3 +150,38 @@ class Evaluator:
             return 0
 
         return int(self._get_llm_score(query, complexity, requires_login, response))
+
+    def score_batch(self, items: List[Dict[str, Any]], max_concurrency: int = 8) -> List[Optional[int]]:
+        """Scores many responses with a single batched chain call.
+
+        Each item holds the `calculate_score` arguments (`query`, `complexity`, `requires_login`, `response`,
+        `success`). Scores are returned in the same order, with None where the LLM evaluation failed.
+        """
+        scores: List[Optional[int]] = [0] * len(items)
+        keys: Dict[int, str] = {}
+        pending = []
+        for i, item in enumerate(items):
+            if not item["success"]:
+                continue
+            if self.cache is not None:
+                keys[i] = self._cache_key(item["query"], item["complexity"], item["requires_login"], item["response"])
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    scores[i] = cached
+                    continue
+            pending.append(i)
+        if not pending:
+            return scores
+
+        inputs = [self._build_input(items[i]["query"], items[i]["complexity"], items[i]["requires_login"],
+                                    items[i]["response"]) for i in pending]
+        llm_responses = self.limited_chain.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+        for i, llm_response in zip(pending, llm_responses):
+            score = self._parse_llm_score(llm_response)
+            if score is None:
+                scores[i] = None
+                continue
+            scores[i] = int(score)
+            if i in keys:
+                self.cache.put(keys[i], scores[i])
+        return scores
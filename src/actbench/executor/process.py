@@ -0,0 +1,151 @@
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple, Union
+
+from ..clients import BaseClient, get_agent_client
+from ..datasets import get_all_task_ids, load_task_data
+from ..ratelimit import apply_rate_limits
+from .engine import JobQueue, as_job_queue
+from .task_executor import TaskExecutor
+
+# (task_id, agent_name, main_dep)
+ProcessJob = Tuple[str, str, str]
+# Called in the parent with the job and either the agent's raw result or the error that stopped it.
+JobCallback = Callable[[ProcessJob, Union[Dict[str, Any], Exception]], None]
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(api_keys: Dict[str, str], rate_limits: List[tuple], workers: int, events, stop_event) -> None:
+    # Ctrl-C reaches the whole process group; only the parent handles it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    apply_rate_limits(rate_limits, workers)
+    get_all_task_ids()
+    _WORKER.update(api_keys=api_keys, events=events, stop_event=stop_event, clients={})
+
+
+def _get_client(agent_name: str, main_dep: str) -> BaseClient:
+    clients: Dict[str, BaseClient] = _WORKER["clients"]
+    if agent_name not in clients:
+        client = get_agent_client(agent_name)
+        client.set_api_key(_WORKER["api_keys"][main_dep])
+        clients[agent_name] = client
+    return clients[agent_name]
+
+
+def _run_job(index: int, task_id: str, agent_name: str, main_dep: str) -> None:
+    events = _WORKER["events"]
+    if _WORKER["stop_event"].is_set():
+        events.put(("skipped", index, None))
+        return
+    try:
+        task_data = load_task_data(task_id)
+        executor = TaskExecutor(agent_name, main_dep, _WORKER["api_keys"], task_data, "",
+                                agent=_get_client(agent_name, main_dep))
+        events.put(("done", index, executor.execute()))
+    except Exception as e:
+        events.put(("error", index, RuntimeError(str(e))))
+
+
+def run_in_processes(jobs: Union[JobQueue, Iterable[ProcessJob]], parallel: int, api_keys: Dict[str, str],
+                     rate_limits: List[tuple], terminate_event: threading.Event, on_result: JobCallback) -> None:
+    """Runs jobs on a pool of `parallel` worker processes, so CPU-heavy agents are not bound by one GIL.
+
+    Each worker loads the dataset index and agent clients once. Workers only run the agent; results come back
+    over a queue and `on_result` stores them in this process. When `terminate_event` is set, jobs that have not
+    started are dropped and running ones are allowed to finish; their results are still passed to `on_result`.
+
+    A worker process that dies breaks the whole pool: every job in flight is passed to `on_result` as an error
+    and the pool is started again. If it breaks again before any job finished on it, `terminate_event` is set and the
+    jobs not started are left for `actbench run --resume`.
+    """
+    jobs = as_job_queue(jobs)
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    stop_event = context.Event()
+    # Job index -> its future and the job, for the jobs handed to the pool.
+    running: Dict[int, Tuple[concurrent.futures.Future, ProcessJob]] = {}
+    indices = itertools.count()
+
+    def start_pool() -> concurrent.futures.ProcessPoolExecutor:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=parallel, mp_context=context,
+                                                      initializer=_init_worker,
+                                                      initargs=(api_keys, rate_limits, parallel, events, stop_event))
+
+    pool = start_pool()
+    # Whether a job finished since the pool was last started again; if none did, it is not started again.
+    finished = True
+    try:
+        while True:
+            if terminate_event.is_set():
+                stop_event.set()
+            else:
+                while len(running) < parallel:
+                    job = jobs.next()
+                    if job is None:
+                        break
+                    index = next(indices)
+                    running[index] = (_submit(pool, index, job), job)
+                    if running[index][0].done():
+                        break
+            if not running:
+                break
+            try:
+                kind, index, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                if not _collect_crashed(running, jobs, on_result):
+                    continue
+                pool.shutdown(wait=False, cancel_futures=True)
+                if not finished:
+                    logging.error("Worker processes keep failing; stopping. Run again with --resume to run the "
+                                  "remaining tasks.")
+                    terminate_event.set()
+                    break
+                logging.error("A worker process died; restarting the process pool.")
+                pool, finished = start_pool(), False
+                continue
+            if index not in running:
+                continue
+            _, job = running.pop(index)
+            jobs.done(job)
+            if kind != "skipped":
+                finished = True
+                on_result(job, payload)
+    finally:
+        pool.shutdown()
+
+
+def _submit(pool: concurrent.futures.ProcessPoolExecutor, index: int, job: ProcessJob) -> concurrent.futures.Future:
+    try:
+        return pool.submit(_run_job, index, *job)
+    except BrokenProcessPool as e:
+        # Reported like the jobs that were in flight when the pool broke.
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_exception(e)
+        return future
+
+
+def _collect_crashed(running: Dict[int, Tuple[concurrent.futures.Future, ProcessJob]], jobs: JobQueue,
+                     on_result: JobCallback) -> bool:
+    """Passes the jobs whose worker process died to `on_result` as errors. Returns whether the pool broke, in
+    which case none of the jobs in `running` will finish and all of them are passed on."""
+    # `_run_job` reports its own errors, so a failed future means its worker process died.
+    broken = any(future.done() and not future.cancelled() and isinstance(future.exception(), BrokenProcessPool)
+                 for future, _ in running.values())
+    for index, (future, job) in list(running.items()):
+        error: Optional[BaseException] = None
+        if future.done() and not future.cancelled():
+            error = future.exception()
+        elif broken:
+            error = BrokenProcessPool("the process pool was terminated")
+        if error is not None:
+            del running[index]
+            jobs.done(job)
+            on_result(job, RuntimeError(f"Worker process failed: {error}"))
+    return broken
@@ -0,0 +1,236 @@
+import heapq
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from .engine import JobQueue
+from ..stats import QuantileSketch
+
+# Expected duration, in milliseconds, of a task of each dataset complexity when no past results tell better.
+COMPLEXITY_ESTIMATES_MS = {"low": 60_000, "medium": 180_000, "high": 600_000}
+DEFAULT_ESTIMATE_MS = COMPLEXITY_ESTIMATES_MS["medium"]
+
+SCHEDULES = ("lpt", "dataset")
+
+# Latencies kept per (task, agent) pair; the estimate is their median.
+HISTORY_SAMPLES = 5
+
+Pair = Tuple[str, str]
+
+
+class DurationModel:
+    """Expected duration of a (task, agent) pair, learned from the latencies of stored results.
+
+    A pair's estimate is the median of its latest `HISTORY_SAMPLES` latencies. A pair that never ran gets the
+    median latency of the agent's past tasks of the same complexity, and failing that `COMPLEXITY_ESTIMATES_MS`.
+    `complexity_of` returns a task's dataset complexity.
+    """
+
+    def __init__(self, complexity_of: Callable[[str], Optional[str]]):
+        self.complexity_of = complexity_of
+        self.pairs: Dict[Pair, List[int]] = {}
+        self.by_complexity: Dict[Tuple[str, Optional[str]], QuantileSketch] = {}
+        self._medians: Dict[Tuple[str, Optional[str]], float] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        latency = result.get("latency_ms")
+        if latency is None or latency <= 0:
+            return
+        task_id, agent = str(result["task_id"]), result["agent"]
+        samples = self.pairs.setdefault((task_id, agent), [])
+        samples.append(latency)
+        if len(samples) > HISTORY_SAMPLES:
+            del samples[0]
+        key = (agent, self._complexity(task_id))
+        self.by_complexity.setdefault(key, QuantileSketch()).add(latency)
+        self._medians.pop(key, None)
+
+    def _complexity(self, task_id: str) -> Optional[str]:
+        try:
+            return self.complexity_of(task_id)
+        except KeyError:
+            return None
+
+    def has_history(self, task_id: str, agent: str) -> bool:
+        return (str(task_id), agent) in self.pairs
+
+    def estimate(self, task_id: str, agent: str) -> float:
+        """Expected milliseconds the pair takes to run."""
+        task_id = str(task_id)
+        samples = self.pairs.get((task_id, agent))
+        if samples:
+            return statistics.median(samples)
+        complexity = self._complexity(task_id)
+        key = (agent, complexity)
+        if key not in self._medians:
+            sketch = self.by_complexity.get(key)
+            self._medians[key] = sketch.quantile(0.5) if sketch is not None \
+                else COMPLEXITY_ESTIMATES_MS.get(complexity, DEFAULT_ESTIMATE_MS)
+        return self._medians[key]
+
+
+def lpt_order(pairs: Iterable[Pair], estimate: Callable[[str, str], float]) -> List[Pair]:
+    """Longest expected processing time first. Starting the long tasks early keeps the slow tail of a run from
+    running on an otherwise idle pool. Pairs with equal estimates keep their order."""
+    return sorted(pairs, key=lambda pair: -estimate(*pair))
+
+
+def predict_makespan(durations: Iterable[float], parallel: int) -> float:
+    """Simulates list scheduling: each job, in order, starts on the first of `parallel` workers to become free.
+    Returns when the last one finishes."""
+    workers = [0.0] * max(parallel, 1)
+    for duration in durations:
+        heapq.heapreplace(workers, workers[0] + duration)
+    return max(workers)
+
+
+def domain_of(url: str) -> str:
+    """The host a task's URL points at, without a leading `www.`: `bbc.com` for https://www.bbc.com/news/."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainStats:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.queued = 0
+        self.running = 0
+        self.done = 0
+        self.latency = QuantileSketch()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "queued": self.queued, "running": self.running, "tasks": self.done,
+                "latency_ms_p50": self.latency.quantile(0.5), "latency_ms_p95": self.latency.quantile(0.95)}
+
+
+class DomainScheduler(JobQueue):
+    """Starts jobs in the order given, but at most `max_per_domain` at a time for any one domain.
+
+    While a domain is at its cap the engine gets the next job for another domain instead, so the other slots
+    stay busy. `limits` sets the cap of single domains, their subdomains included; a cap of 0 is unlimited.
+    `jobs` yields (domain, job) pairs. With `make_job`, they yield (domain, item) pairs instead and each job is
+    only made from its item when it starts, so the queue holds small items rather than jobs. `domains` holds
+    each domain's queued, running and finished jobs and the wall-clock latency of the finished ones.
+
+    Jobs can also be held back by a limit of their own: `group_of` maps an item to its group (e.g. its agent),
+    and `try_start` takes a slot for a group if it has one free. A job whose group has no room is skipped like
+    one whose domain is at its cap, before it takes one of the engine's slots; the job must free its group's
+    slot when it finishes.
+
+    With `on_upcoming`, each call to `next` first passes it the items among the next `lookahead` to start that
+    it was not given before, e.g. to prepare their resources in the order the jobs will actually start.
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[str, Any]], max_per_domain: int = 0,
+                 limits: Optional[Dict[str, int]] = None, make_job: Optional[Callable[[Any], Any]] = None,
+                 lookahead: int = 0, on_upcoming: Optional[Callable[[List[Any]], None]] = None,
+                 group_of: Optional[Callable[[Any], Any]] = None, try_start: Optional[Callable[[Any], bool]] = None):
+        self.max_per_domain = max_per_domain
+        self.limits = limits or {}
+        self.make_job = make_job
+        self.lookahead = lookahead
+        self.on_upcoming = on_upcoming
+        self.try_start = try_start
+        self.domains: Dict[str, DomainStats] = {}
+        # The jobs not started yet of each (domain, group), with their position in the overall order.
+        self._queues: Dict[Tuple[str, Any], Deque[Tuple[int, Any]]] = {}
+        # Positions of the jobs already passed to `on_upcoming` that have not started yet.
+        self._announced: Set[int] = set()
+        self._started: Dict[int, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        for position, (domain, job) in enumerate(jobs):
+            key = (domain, group_of(job) if group_of is not None else None)
+            self._queues.setdefault(key, deque()).append((position, job))
+            if domain not in self.domains:
+                self.domains[domain] = DomainStats(self.limit_for(domain))
+            self.domains[domain].queued += 1
+
+    def limit_for(self, domain: str) -> int:
+        parts = domain.split(".")
+        for i in range(len(parts)):
+            limit = self.limits.get(".".join(parts[i:]))
+            if limit is not None:
+                return limit
+        return self.max_per_domain
+
+    def _has_room(self, domain: str, running: int) -> bool:
+        limit = self.domains[domain].limit
+        return not limit or running < limit
+
+    def _upcoming(self, count: int) -> List[Tuple[int, Any]]:
+        """The next `count` queued jobs `next` would hand out if no running job finished in the meantime,
+        followed by the first job of each domain that is at its cap, which starts once one of its jobs finishes.
+        Group limits are not taken into account."""
+        running = {domain: stats.running for domain, stats in self.domains.items()}
+        heads = [(queue[0][0], key, 0) for key, queue in self._queues.items()
+                 if self._has_room(key[0], running[key[0]])]
+        heapq.heapify(heads)
+        upcoming = []
+        while heads and len(upcoming) < count:
+            _, key, index = heapq.heappop(heads)
+            queue = self._queues[key]
+            upcoming.append(queue[index])
+            running[key[0]] += 1
+            if index + 1 < len(queue):
+                heapq.heappush(heads, (queue[index + 1][0], key, index + 1))
+            # Other queues of a domain that just reached its cap hold no more upcoming jobs.
+            heads = [head for head in heads if self._has_room(head[1][0], running[head[1][0]])]
+            heapq.heapify(heads)
+        if len(upcoming) < count:
+            held: Dict[str, Tuple[int, Any]] = {}
+            for (domain, _), queue in self._queues.items():
+                if not self._has_room(domain, self.domains[domain].running) \
+                        and (domain not in held or queue[0][0] < held[domain][0]):
+                    held[domain] = queue[0]
+            upcoming.extend(sorted(held.values())[:count - len(upcoming)])
+        return upcoming
+
+    def next(self) -> Optional[Any]:
+        with self._lock:
+            if self.on_upcoming is not None and self.lookahead:
+                new = [(position, item) for position, item in self._upcoming(self.lookahead)
+                       if position not in self._announced]
+                if new:
+                    self._announced.update(position for position, _ in new)
+                    self.on_upcoming([item for _, item in new])
+            candidates = sorted((queue[0][0], key) for key, queue in self._queues.items()
+                                if self._has_room(key[0], self.domains[key[0]].running))
+            chosen = None
+            full_groups = set()
+            for _, key in candidates:
+                if key[1] in full_groups:
+                    continue
+                if self.try_start is None or self.try_start(key[1]):
+                    chosen = key
+                    break
+                full_groups.add(key[1])
+            if chosen is None:
+                return None
+            position, job = self._queues[chosen].popleft()
+            self._announced.discard(position)
+            if self.make_job is not None:
+                job = self.make_job(job)
+            if not self._queues[chosen]:
+                del self._queues[chosen]
+            domain = chosen[0]
+            stats = self.domains[domain]
+            stats.queued -= 1
+            stats.running += 1
+            self._started[id(job)] = (domain, time.perf_counter())
+            return job
+
+    def done(self, job: Any) -> None:
+        with self._lock:
+            domain, started = self._started.pop(id(job))
+            stats = self.domains[domain]
+            stats.running -= 1
+            stats.done += 1
+            stats.latency.add((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current counts and latency per domain, for the progress view and the run metadata."""
+        with self._lock:
+            return {domain: stats.to_dict() for domain, stats in self.domains.items()}
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Union
+
+SCORE_CACHE_PATH = os.path.join("cache", "scores.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    key TEXT PRIMARY KEY,
+    score INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_last_used ON scores (last_used);
+"""
+
+
+def _normalize_response(response: Union[str, Dict[str, Any], None]) -> str:
+    if isinstance(response, (dict, list)):
+        return json.dumps(response, sort_keys=True, default=str)
+    return " ".join(str(response).split()) if response is not None else ""
+
+
+class ScoreCache:
+    """On-disk LRU cache of LLM scores, so identical responses are only scored once per model and prompt."""
+
+    def __init__(self, path: str = SCORE_CACHE_PATH, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._size = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    @staticmethod
+    def make_key(query: str, complexity: str, requires_login: bool, response: Union[str, Dict[str, Any]],
+                 model_name: str, temperature: float, prompt_version: str) -> str:
+        payload = json.dumps([query, _normalize_response(response), complexity, bool(requires_login), model_name,
+                              temperature, prompt_version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT score FROM scores WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE scores SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, score: int) -> None:
+        with self._lock, self._conn:
+            inserted = self._conn.execute("INSERT OR IGNORE INTO scores (key, score, last_used) VALUES (?, ?, ?)",
+                                          (key, score, time.time())).rowcount
+            if not inserted:
+                self._conn.execute("UPDATE scores SET score = ?, last_used = ? WHERE key = ?",
+                                   (score, time.time(), key))
+            self._size += inserted
+            if self._size > self.max_entries:
+                overflow = self._size - self.max_entries
+                self._conn.execute("DELETE FROM scores WHERE key IN "
+                                   "(SELECT key FROM scores ORDER BY last_used LIMIT ?)", (overflow,))
+                self._size -= overflow
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
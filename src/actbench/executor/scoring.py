@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+from .evaluator import Evaluator
+from ..storage import update_result
+from ..storage.writer import ResultWriter
+
+_STOP = object()
+
+
+class ScoringPipeline:
+    """Scores finished results on a separate stage, so agent workers are freed as soon as the agent returns.
+
+    Submitted results are drained in batches of up to `concurrency` and scored with `Evaluator.score_batch`;
+    each stored row is then updated with its score and the model and prompt version that produced it, and its
+    `phases` with the time spent waiting for a batch (`scoring_wait`) and in the batch call (`scoring`).
+    With `max_pending` set, `submit` blocks once that many results are waiting. `on_scored` is called after
+    each batch with the submitted items (which include `agent`, `success` and `scoring_phases`) and their scores.
+    Rows are updated through `writer` if given, and otherwise through the writer of their run.
+    """
+
+    def __init__(self, evaluator: Evaluator, concurrency: int = 8, flush_interval: float = 0.5,
+                 max_pending: int = 0,
+                 on_scored: Optional[Callable[[List[Dict[str, Any]], List[Optional[int]]], None]] = None,
+                 writer: Optional[ResultWriter] = None):
+        self.evaluator = evaluator
+        self.writer = writer
+        self.concurrency = concurrency
+        self.flush_interval = flush_interval
+        self.on_scored = on_scored
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._drain, name="scoring", daemon=True)
+        self._thread.start()
+
+    def submit(self, run_id: str, result_id: str, task_data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Queues a stored result for scoring. Returns immediately unless `max_pending` results are waiting."""
+        self._queue.put({
+            "run_id": run_id,
+            "result_id": result_id,
+            "agent": result.get("agent"),
+            "query": task_data["query"],
+            "complexity": task_data["complexity"],
+            "requires_login": task_data["requires_login"],
+            "response": result.get("response"),
+            "success": result["success"],
+            "phases": result.get("phases") or {},
+            "queued_at": time.perf_counter(),
+        })
+
+    async def wait_for_room(self) -> None:
+        """Waits, without blocking the event loop, until `submit` would not block."""
+        while self._queue.full():
+            await asyncio.sleep(0.05)
+
+    def close(self, cancel: bool = False) -> None:
+        """Waits for every queued result to be scored, or drops the unscored ones when `cancel` is set."""
+        if cancel:
+            self._cancelled.set()
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _update(self, run_id: str, result_id: str, **fields: Any) -> None:
+        if self.writer is not None:
+            self.writer.update(run_id, result_id, fields)
+        else:
+            update_result(run_id, result_id, **fields)
+
+    def _drain(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.concurrency and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            items = [item for item in batch if item is not _STOP]
+            stop = len(items) < len(batch)
+            if not items or self._cancelled.is_set():
+                continue
+            started = time.perf_counter()
+            try:
+                scores = self.evaluator.score_batch(items, max_concurrency=self.concurrency)
+            except Exception as e:
+                logging.error(f"Scoring batch of {len(items)} results failed: {e}")
+                scores = [None] * len(items)
+            finished = time.perf_counter()
+            for item, score in zip(items, scores):
+                item["scoring_phases"] = {"scoring_wait": int((started - item["queued_at"]) * 1000),
+                                          "scoring": int((finished - started) * 1000)}
+                phases = {**item["phases"], **item["scoring_phases"]}
+                if score is None:
+                    # Left without a score version so that `actbench score` retries it.
+                    self._update(item["run_id"], item["result_id"], score=0, score_model=None,
+                                 score_prompt_version=None, phases=phases)
+                else:
+                    self._update(item["run_id"], item["result_id"], score=score,
+                                 score_model=self.evaluator.model_name,
+                                 score_prompt_version=self.evaluator.prompt_version, phases=phases)
+            if self.on_scored is not None:
+                self.on_scored(items, scores)
@@ -0,0 +1,19 @@
+import hashlib
+from typing import Tuple
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parses `i/N` (1 <= i <= N) into a 1-based shard index and the shard count."""
+    index, sep, count = value.partition("/")
+    if not sep:
+        raise ValueError(f"{value!r} is not of the form i/N.")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}.")
+    return index, count
+
+
+def shard_of(task_id: str, agent: str, count: int) -> int:
+    """Returns the 1-based shard a (task, agent) pair belongs to. Stable across machines and Python versions."""
+    digest = hashlib.sha256(f"{task_id}\0{agent}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
@@ -1,24 +1,38 @@
 import time
-from typing import Dict, Any
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, TYPE_CHECKING
 
-from .evaluator import Evaluator
-from ..browser import FleetBrowser
+from ..browser import BrowserPool
 from ..clients import get_agent_client, BaseClient
 from ..storage import insert_result
+from ..timing import record_phases, span
+
+if TYPE_CHECKING:
+    from .scoring import ScoringPipeline
+    from ..browser.local import LocalBrowserManager
 
 
 class TaskExecutor:
     """Handles the execution of a single task."""
 
     def __init__(self, agent_name: str, main_dep: str, api_keys: Dict[str, str], task_data: Dict[str, Any], run_id: str,
-                 no_scoring: bool):
+                 scorer: Optional["ScoringPipeline"] = None, browser_pool: Optional[BrowserPool] = None,
+                 local_browsers: Optional["LocalBrowserManager"] = None, agent: Optional[BaseClient] = None):
         self.agent_name = agent_name
         self.main_dep = main_dep
         self.api_keys = api_keys
         self.task_data = task_data
         self.run_id = run_id
-        self.no_scoring = no_scoring
-        self.agent = self._get_agent()
+        self.scorer = scorer
+        self.browser_pool = browser_pool
+        self.local_browsers = local_browsers
+        self._agent = agent
+
+    @property
+    def agent(self) -> BaseClient:
+        if self._agent is None:
+            self._agent = self._get_agent()
+        return self._agent
 
     def _get_agent(self) -> BaseClient:
         """Gets the agent client and sets the API key."""
@@ -26,28 +40,75 @@ class TaskExecutor:
         client.set_api_key(self.api_keys[self.main_dep])
         return client
 
+    @staticmethod
+    def uses_remote_browser(agent_name: str) -> bool:
+        """Whether the agent drives a remote Fleet browser session."""
+        return agent_name != 'raccoonai' and "-local" not in agent_name
+
+    def _get_browser_pool(self) -> Optional[BrowserPool]:
+        if not self.uses_remote_browser(self.agent_name):
+            return None
+        if self.browser_pool is None:
+            from ..browser import FleetBrowser
+            # Without a shared pool, sessions are created on demand but still terminated by the lease.
+            self.browser_pool = BrowserPool(lambda: FleetBrowser(self.api_keys['raccoonai']), size=0)
+        return self.browser_pool
+
+    def record(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores an agent result and hands it to the scoring stage."""
+        # The score is filled in by the scoring stage once it is ready; until then it stays -1.
+        result_id = insert_result(str(self.task_data['task_id']), self.agent_name, result['success'],
+                                  result.get('latency_ms', -1), self.run_id, result.get('response'), -1,
+                                  phases=result.get('phases'))
+        if self.scorer is not None:
+            self.scorer.submit(self.run_id, result_id, self.task_data, result)
+        result["result_id"] = result_id
+        result["score"] = -1
+        return result
+
+    def record_error(self, e: Exception) -> Dict[str, Any]:
+        insert_result(str(self.task_data['task_id']), self.agent_name, False, -1, self.run_id, str(e))
+        return {"task_id": self.task_data['task_id'], "agent": self.agent_name, "success": False,
+                "run_id": self.run_id, "response": str(e), "timestamp": time.time() * 1000}
+
+    def execute(self) -> Dict[str, Any]:
+        """Runs the agent on the task and returns its raw result, without storing it.
+
+        The time spent in each phase of the task is added to the result as `phases`.
+        """
+        pool = self._get_browser_pool()
+        with record_phases() as phases:
+            with pool.lease(self.task_data["url"]) if pool else nullcontext() as browser:
+                with span("agent"):
+                    result = self.agent.run(self.task_data, browser)
+        result["phases"] = phases
+        return result
+
     def run(self) -> Dict[str, Any]:
         """Executes the task and returns the result."""
         try:
-            browser = None
-            if self.agent_name != 'raccoonai' and "-local" not in self.agent_name:
-                browser = FleetBrowser(self.api_keys['raccoonai'])
-
-            result = self.agent.run(self.task_data, browser)
+            return self.record(self.execute())
+        except Exception as e:
+            return self.record_error(e)
 
-            if self.no_scoring:
-                score = -1
+    async def arun(self) -> Dict[str, Any]:
+        """Executes the task on the running event loop and returns the result."""
+        try:
+            pool = self._get_browser_pool()
+            if pool is not None:
+                lease = pool.alease(self.task_data["url"])
+            elif self.local_browsers is not None and self.agent_name != 'raccoonai':
+                lease = self.local_browsers.lease()
             else:
-                evaluator = Evaluator(self.api_keys['openai'])
-                score = evaluator.calculate_score(self.task_data['query'], self.task_data['complexity'],
-                                                  self.task_data['requires_login'], result.get('response'),
-                                                  result['success'])
-
-            insert_result(str(self.task_data['task_id']), self.agent_name, result['success'],
-                          result.get('latency_ms', -1), self.run_id, result.get('response'), score)
-            result["score"] = score
-            return result
+                lease = nullcontext()
+            with record_phases() as phases:
+                async with lease as browser:
+                    with span("agent"):
+                        result = await self.agent.arun(self.task_data, browser)
+            result["phases"] = phases
+            if self.scorer is not None:
+                # `record` runs on the event loop, where a full scoring queue would hold up every other task.
+                await self.scorer.wait_for_room()
+            return self.record(result)
         except Exception as e:
-            insert_result(str(self.task_data['task_id']), self.agent_name, False, -1, self.run_id, str(e))
-            return {"task_id": self.task_data['task_id'], "agent": self.agent_name, "success": False,
-                    "run_id": self.run_id, "response": str(e), "timestamp": time.time() * 1000}
+            return self.record_error(e)
@@ -0,0 +1,134 @@
+import asyncio
+import math
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+PROVIDERS = ("raccoonai", "openai", "fleet")
+
+_LIMITERS: Dict[str, "RateLimiter"] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+class RateLimiter:
+    """Token bucket limiting requests per second, plus an optional cap on requests in flight.
+
+    A `rate` or `max_in_flight` of 0 means unlimited. Up to `burst` requests may go out at once after an idle
+    spell; it defaults to one second's worth of requests. Usable from threads (`limit`) and from coroutines
+    (`alimit`) alike.
+    """
+
+    def __init__(self, rate: float = 0, max_in_flight: int = 0, burst: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.configure(rate, max_in_flight, burst)
+
+    def configure(self, rate: float = 0, max_in_flight: int = 0, burst: Optional[float] = None) -> None:
+        with self._lock:
+            self.rate = rate
+            self.capacity = max(1.0, rate if burst is None else burst)
+            self.max_in_flight = max_in_flight
+            self._tokens = self.capacity
+            self._updated = time.monotonic()
+
+    def try_reserve(self) -> bool:
+        """Takes a token if one is available right away. Returns whether it did."""
+        with self._lock:
+            if self.rate <= 0:
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def reserve(self) -> float:
+        """Takes a token, possibly borrowing against the future, and returns how long to wait for it."""
+        with self._lock:
+            if self.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def _try_enter(self) -> bool:
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent. Must be paired with `release`."""
+        while not self._try_enter():
+            time.sleep(0.05)
+        try:
+            time.sleep(self.reserve())
+        except BaseException:
+            self.release()
+            raise
+
+    async def aacquire(self) -> None:
+        """Waits, without blocking the event loop, until a request may be sent. Must be paired with `release`."""
+        while not self._try_enter():
+            await asyncio.sleep(0.05)
+        try:
+            await asyncio.sleep(self.reserve())
+        except BaseException:
+            self.release()
+            raise
+
+    @contextmanager
+    def limit(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def alimit(self):
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Returns the shared limiter for a provider. Providers without a configured limit are unlimited."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limiter = RateLimiter()
+            _LIMITERS[provider] = limiter
+        return limiter
+
+
+def configure_rate_limit(provider: str, rate: float = 0, max_in_flight: Optional[int] = None,
+                         burst: Optional[float] = None) -> None:
+    """Sets the requests/sec (and optionally the in-flight cap and burst) for a provider's outbound API calls."""
+    limiter = get_rate_limiter(provider)
+    limiter.configure(rate, limiter.max_in_flight if max_in_flight is None else max_in_flight, burst)
+
+
+def apply_rate_limits(limits: Iterable[Tuple[Optional[str], float, Optional[int], Optional[float]]],
+                      workers: int = 1) -> None:
+    """Configures `(provider, rate, max_in_flight, burst)` limits; a provider of None applies to every provider.
+
+    Processes sharing the limits each pass the number of `workers`, and take an even share of them.
+    """
+    for provider, rate, max_in_flight, burst in limits:
+        if max_in_flight:
+            max_in_flight = math.ceil(max_in_flight / workers)
+        for name in [provider] if provider else PROVIDERS:
+            configure_rate_limit(name, rate / workers, max_in_flight, burst)
@@ -0,0 +1,28 @@
+import asyncio
+import time
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from . import get_rate_limiter
+
+
+class ProviderRateLimiter(BaseRateLimiter):
+    """Plugs a provider's shared token bucket into a LangChain chat model's `rate_limiter` hook.
+
+    LangChain has no release hook, so only the requests/sec limit applies here, not `max_in_flight`.
+    """
+
+    def __init__(self, provider: str):
+        self.limiter = get_rate_limiter(provider)
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.limiter.try_reserve()
+        time.sleep(self.limiter.reserve())
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.limiter.try_reserve()
+        await asyncio.sleep(self.limiter.reserve())
+        return True
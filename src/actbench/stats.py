@@ -0,0 +1,216 @@
+import math
+import threading
+from typing import Dict, Any, Iterable, Optional
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded memory and relative error (DDSketch-style log buckets).
+
+    Every quantile is within `relative_accuracy` of the true value. Positive values go into logarithmic buckets,
+    zero and negative values into a single bucket for 0. Past `max_buckets` the lowest buckets are folded
+    together, which only costs accuracy at the bottom of the range. Sketches with the same accuracy can be merged.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            value = 0
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def _collapse(self) -> None:
+        keys = sorted(self.buckets)
+        folded = keys[:len(keys) - self.max_buckets + 1]
+        self.buckets[folded[-1]] += sum(self.buckets.pop(key) for key in folded[:-1])
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the value at quantile `q` (between 0 and 1), or None if the sketch is empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"relative_accuracy": self.relative_accuracy, "buckets": self.buckets, "zero_count": self.zero_count,
+                "count": self.count, "sum": self.sum, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.buckets = {int(key): count for key, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+
+class AgentStats:
+    """Counts and distributions for one agent's results.
+
+    Latency and score are taken over successful results only, like the summary table always has;
+    `phases` holds a sketch per phase timing (see `actbench.timing`). `first_timestamp` and `last_timestamp`
+    bound the results' timestamps, in milliseconds.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.success = 0
+        self.errors = 0
+        self.first_timestamp: Optional[int] = None
+        self.last_timestamp: Optional[int] = None
+        self.latency = QuantileSketch()
+        self.score = QuantileSketch()
+        self.phases: Dict[str, QuantileSketch] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.total += 1
+        timestamp = result.get("timestamp")
+        if timestamp is not None:
+            self._add_timestamps(timestamp, timestamp)
+        if result.get("success"):
+            self.success += 1
+            if result.get("latency_ms", -1) > 0:
+                self.latency.add(result["latency_ms"])
+            self.add_score(True, result.get("score", -1))
+        else:
+            self.errors += 1
+        self.add_phases(result.get("phases") or {})
+
+    def add_score(self, success: bool, score: Optional[int]) -> None:
+        """Adds a result's score. Scores of -1 (not scored yet) and of failed results are ignored."""
+        if success and score is not None and score >= 0:
+            self.score.add(score)
+
+    def _add_timestamps(self, first: Optional[int], last: Optional[int]) -> None:
+        if first is not None:
+            self.first_timestamp = first if self.first_timestamp is None else min(self.first_timestamp, first)
+        if last is not None:
+            self.last_timestamp = last if self.last_timestamp is None else max(self.last_timestamp, last)
+
+    def add_phases(self, phases: Dict[str, int]) -> None:
+        for phase, ms in phases.items():
+            self.phases.setdefault(phase, QuantileSketch()).add(ms)
+
+    def merge(self, other: "AgentStats") -> None:
+        self.total += other.total
+        self.success += other.success
+        self.errors += other.errors
+        self._add_timestamps(other.first_timestamp, other.last_timestamp)
+        self.latency.merge(other.latency)
+        self.score.merge(other.score)
+        for phase, sketch in other.phases.items():
+            self.phases.setdefault(phase, QuantileSketch(sketch.relative_accuracy)).merge(sketch)
+
+    @property
+    def success_rate(self) -> float:
+        return self.success / self.total if self.total else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"total": self.total, "success": self.success, "errors": self.errors,
+                "first_timestamp": self.first_timestamp, "last_timestamp": self.last_timestamp,
+                "latency": self.latency.to_dict(), "score": self.score.to_dict(),
+                "phases": {phase: sketch.to_dict() for phase, sketch in self.phases.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentStats":
+        stats = cls()
+        stats.total = data["total"]
+        stats.success = data["success"]
+        stats.errors = data["errors"]
+        stats.first_timestamp = data["first_timestamp"]
+        stats.last_timestamp = data["last_timestamp"]
+        stats.latency = QuantileSketch.from_dict(data["latency"])
+        stats.score = QuantileSketch.from_dict(data["score"])
+        stats.phases = {phase: QuantileSketch.from_dict(sketch) for phase, sketch in data["phases"].items()}
+        return stats
+
+
+class RunAggregator:
+    """Per-agent statistics of a run, updated one result at a time in bounded memory.
+
+    The run command feeds it each result as it completes and each score as the scoring stage produces it;
+    for stored runs it is built by streaming the rows with `from_results`. Aggregators can be merged.
+    """
+
+    def __init__(self):
+        self.agents: Dict[str, AgentStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self.agents.setdefault(result["agent"], AgentStats()).add(result)
+
+    def add_score(self, agent: str, success: bool, score: Optional[int],
+                  phases: Optional[Dict[str, int]] = None) -> None:
+        """Adds the late score of a result that was added before it was scored, and the scoring phase timings."""
+        with self._lock:
+            stats = self.agents.setdefault(agent, AgentStats())
+            stats.add_score(success, score)
+            stats.add_phases(phases or {})
+
+    def merge(self, other: "RunAggregator") -> None:
+        with self._lock:
+            for agent, stats in other.agents.items():
+                self.agents.setdefault(agent, AgentStats()).merge(stats)
+
+    @property
+    def total(self) -> int:
+        return sum(stats.total for stats in self.agents.values())
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict[str, Any]]) -> "RunAggregator":
+        aggregator = cls()
+        for result in results:
+            aggregator.add(result)
+        return aggregator
@@ -1,22 +1,49 @@
+import atexit
 import json
-import logging
 import os
+import threading
 import time
-from typing import List, Dict, Any, Optional
+import uuid
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+from .base import BaseStorage
+from .blobs import resolve_response
+from .jsonl import JsonlStorage
+from .merge import merge_run as merge_run_into, open_storage
+from .sqlite import SqliteStorage
+from .summaries import build_summaries, summarize_missing_runs, summarize_run
+from .writer import ResultWriter
+from ..stats import RunAggregator
 
 KEYS_FILE = "keys.json"
 RESULTS_DIR = "results"
+RESULTS_DB = os.path.join(RESULTS_DIR, "results.db")
+STORAGE_BACKEND = os.environ.get("ACTBENCH_STORAGE", "sqlite")
+# The writer `actbench score` updates the rows of every run through.
+SCORE_WRITER = "score"
+
+_STORAGE_READY = False
+_STORAGE_INSTANCE: Optional[BaseStorage] = None
+_STORAGE_LOCK = threading.Lock()
+_WRITERS: Dict[str, ResultWriter] = {}
+_WRITERS_LOCK = threading.Lock()
 
 
 def _ensure_storage():
+    """Creates the results directory and keys file. Runs once, on first write."""
+    global _STORAGE_READY
+    if _STORAGE_READY:
+        return
     os.makedirs(RESULTS_DIR, exist_ok=True)
     if not os.path.exists(KEYS_FILE):
         with open(KEYS_FILE, "w") as f:
             json.dump({}, f)
+    _STORAGE_READY = True
 
 
 def _load_keys() -> Dict[str, str]:
-    _ensure_storage()
+    if not os.path.exists(KEYS_FILE):
+        return {}
     with open(KEYS_FILE, "r") as f:
         return json.load(f)
 
@@ -27,24 +54,85 @@ def _save_keys(keys: Dict[str, str]) -> None:
         json.dump(keys, f, indent=2)
 
 
-def _get_results_file(run_id: str, agent: str) -> str:
-    agent_dir = os.path.join(RESULTS_DIR, run_id)
-    os.makedirs(agent_dir, exist_ok=True)
-    return os.path.join(agent_dir, f"{agent}.json")
+def _create_storage(backend: str) -> BaseStorage:
+    # Runs that have results but no summary (recorded before summaries were stored, or imported) are summarized
+    # once here, so reading summaries never has to.
+    if backend == "jsonl":
+        # There is no schema to upgrade; a run directory without a summary file is summarized when opened.
+        storage = JsonlStorage(RESULTS_DIR)
+        summarize_missing_runs(storage)
+        return storage
+    if backend == "sqlite":
+        is_new = not os.path.exists(RESULTS_DB)
+        storage = SqliteStorage(RESULTS_DB)
+        if (is_new and storage.import_results_dir(RESULTS_DIR)) or storage.added_summaries:
+            summarize_missing_runs(storage)
+        return storage
+    raise ValueError(f"Unsupported storage backend: {backend}")
+
+
+def get_storage() -> BaseStorage:
+    """Returns the configured results backend (`ACTBENCH_STORAGE`, defaults to sqlite)."""
+    global _STORAGE_INSTANCE
+    with _STORAGE_LOCK:
+        if _STORAGE_INSTANCE is None:
+            _ensure_storage()
+            _STORAGE_INSTANCE = _create_storage(STORAGE_BACKEND)
+        return _STORAGE_INSTANCE
+
+
+def import_legacy_results() -> int:
+    """Copies the per-run JSON result files under `results/` into the SQLite database."""
+    storage = get_storage()
+    if not isinstance(storage, SqliteStorage):
+        raise ValueError("Importing legacy results requires the sqlite storage backend.")
+    imported = storage.import_results_dir(RESULTS_DIR)
+    summarize_missing_runs(storage)
+    return imported
+
+
+def get_result_writer(run_id: str) -> ResultWriter:
+    """Returns the single writer for a run, starting it on first use. A writer can also be shared by several
+    runs under a name of its own, e.g. `SCORE_WRITER`; each operation carries its row's run ID."""
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(run_id)
+        if writer is None:
+            writer = ResultWriter(get_storage(), name=run_id,
+                                  spill_path=os.path.join(RESULTS_DIR, f"unwritten-{run_id}.jsonl"))
+            _WRITERS[run_id] = writer
+        return writer
+
+
+def close_result_writer(run_id: str) -> Optional[Dict[str, Any]]:
+    """Flushes and stops the writer for a run, if one was started, and returns its write statistics."""
+    with _WRITERS_LOCK:
+        writer = _WRITERS.pop(run_id, None)
+    if writer is None:
+        return None
+    writer.close()
+    return writer.stats()
+
+
+def close_all_result_writers() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+        _WRITERS.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all_result_writers)
 
 
 def insert_result(task_id: str, agent: str, success: bool, latency_ms: int, run_id: str,
-                  response: Optional[str] = None, score: int = 0) -> None:
-    _ensure_storage()
-    result_file = _get_results_file(run_id, agent)
-
-    if os.path.exists(result_file):
-        with open(result_file, "r") as f:
-            results = json.load(f)
-    else:
-        results = []
+                  response: Optional[str] = None, score: int = 0, phases: Optional[Dict[str, int]] = None) -> str:
+    """Queues a result for the run's writer and returns the new row's `result_id`.
 
+    `phases` holds the milliseconds the task spent in each phase (see `actbench.timing`).
+    """
+    result_id = uuid.uuid4().hex
     new_result = {
+        "result_id": result_id,
         "task_id": task_id,
         "agent": agent,
         "success": success,
@@ -54,38 +142,91 @@ def insert_result(task_id: str, agent: str, success: bool, latency_ms: int, run_
         "score": score,
         "run_id": run_id,
     }
-    results.append(new_result)
+    if phases is not None:
+        new_result["phases"] = phases
+    get_result_writer(run_id).write(new_result)
+    return result_id
+
 
-    with open(result_file, "w") as f:
-        json.dump(results, f, indent=2)
+def update_result(run_id: str, result_id: str, **fields: Any) -> None:
+    """Queues a partial update (e.g. a late `score`) of a row previously written by `insert_result`."""
+    get_result_writer(run_id).update(run_id, result_id, fields)
 
 
 def get_all_results() -> List[Dict[str, Any]]:
-    _ensure_storage()
-    all_results = []
-    for run_id in os.listdir(RESULTS_DIR):
-        run_dir = os.path.join(RESULTS_DIR, run_id)
-        if os.path.isdir(run_dir):
-            for agent_file in os.listdir(run_dir):
-                if agent_file.endswith(".json"):
-                    filepath = os.path.join(run_dir, agent_file)
-                    with open(filepath, "r") as f:
-                        try:
-                            results = json.load(f)
-                            all_results.extend(results)
-                        except json.JSONDecodeError:
-                            logging.error(f"Warning: Could not decode JSON in {filepath}")
-    return all_results
+    return get_storage().query_results()
+
+
+def iter_results(run_id: Optional[str] = None, agent: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Streams stored results matching the given filters."""
+    return get_storage().iter_results(run_id=run_id, agent=agent)
+
+
+def iter_latencies(agents: List[str]) -> Iterator[Dict[str, Any]]:
+    """Streams the task, agent and latency of the agents' past results, oldest first."""
+    return get_storage().iter_latencies(list(agents))
+
+
+def search_results(**filters: Any) -> Iterator[Dict[str, Any]]:
+    """Streams one page of stored results; see `BaseStorage.search_results` for the filters."""
+    return get_storage().search_results(**filters)
+
+
+def load_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a stored result with its full response, loading it from the blob store if it was stored out of
+    line (the row itself only keeps a preview)."""
+    blobs = get_storage().blobs
+    return resolve_response(result, blobs) if blobs is not None else result
+
+
+def load_responses(results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Streams `load_response` over stored results."""
+    for result in results:
+        yield load_response(result)
 
 
 def get_results_by_agent(agent: str) -> List[Dict[str, Any]]:
-    all_results = get_all_results()
-    return [result for result in all_results if result["agent"] == agent]
+    return get_storage().query_results(agent=agent)
 
 
 def get_results_by_run_id(run_id: str) -> List[Dict[str, Any]]:
-    all_results = get_all_results()
-    return [result for result in all_results if result["run_id"] == run_id]
+    return get_storage().query_results(run_id=run_id)
+
+
+def save_run_metadata(run_id: str, **metadata: Any) -> None:
+    """Records run-level settings and statistics, merged into anything saved for the run before."""
+    get_storage().save_run_metadata(run_id, metadata)
+
+
+def get_run_metadata(run_id: str) -> Optional[Dict[str, Any]]:
+    return get_storage().get_run_metadata(run_id)
+
+
+def merge_run(run_id: str, paths: List[str]) -> Dict[str, Any]:
+    """Merges a run's results from other result stores (e.g. one per shard) into the configured storage."""
+    sources = {path: open_storage(path) for path in paths}
+    try:
+        return merge_run_into(get_storage(), sources, run_id)
+    finally:
+        for source in sources.values():
+            source.close()
+
+
+def save_run_summaries(run_id: str, aggregator: RunAggregator) -> None:
+    """Stores the summary records of a finished run, built from its `RunAggregator`."""
+    started_at = (get_run_metadata(run_id) or {}).get("started_at")
+    get_storage().save_run_summaries(run_id, build_summaries(run_id, aggregator, started_at))
+
+
+def refresh_run_summaries(run_id: str) -> None:
+    """Rebuilds a run's summary records from its stored results, after they changed."""
+    summarize_run(get_storage(), run_id)
+
+
+def get_run_summaries(run_id: Optional[str] = None, agent: Optional[str] = None, since: Optional[int] = None,
+                      until: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Returns the per-(run, agent) summary records matching the filters, oldest run first."""
+    return list(get_storage().iter_run_summaries(run_id=run_id, agent=agent, since=since, until=until))
 
 
 def insert_api_key(agent: str, key: str) -> None:
@@ -102,5 +243,3 @@ def get_api_key(agent: str) -> Optional[str]:
 def get_all_api_keys() -> Dict[str, str]:
     return _load_keys()
 
-
-_ensure_storage()
@@ -0,0 +1,104 @@
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterator, List, Optional
+
+from .blobs import BlobStore
+
+# Fields results can be sorted by in `search_results`.
+SORT_FIELDS = ("timestamp", "latency_ms", "score")
+
+
+class BaseStorage(ABC):
+    # Where large responses are kept out of line (see `blobs.offload_response`); None keeps them in the rows.
+    blobs: Optional[BlobStore] = None
+
+    @abstractmethod
+    def insert_results(self, results: List[Dict[str, Any]]) -> None:
+        """Persists a batch of result records."""
+        pass
+
+    @abstractmethod
+    def update_results(self, updates: List[Dict[str, Any]]) -> None:
+        """Applies a batch of partial updates. Each update carries the `run_id` and `result_id` of the row it changes."""
+        pass
+
+    @abstractmethod
+    def iter_results(self, run_id: Optional[str] = None, agent: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yields the result records matching all the given filters, without loading them all at once."""
+        pass
+
+    @abstractmethod
+    def save_run_metadata(self, run_id: str, metadata: Dict[str, Any]) -> None:
+        """Merges `metadata` into the run's stored metadata (top-level keys are replaced)."""
+        pass
+
+    @abstractmethod
+    def get_run_metadata(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the run's metadata, or None if none was saved."""
+        pass
+
+    @abstractmethod
+    def list_run_ids(self) -> List[str]:
+        """Returns the IDs of every run that has stored results."""
+        pass
+
+    @abstractmethod
+    def save_run_summaries(self, run_id: str, summaries: List[Dict[str, Any]]) -> None:
+        """Replaces the run's summary records (one per agent, see `actbench.storage.summaries`)."""
+        pass
+
+    @abstractmethod
+    def iter_run_summaries(self, run_id: Optional[str] = None, agent: Optional[str] = None,
+                           since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yields the summary records matching all the given filters, oldest run first.
+
+        `since` and `until` bound the run's `started_at`, in milliseconds since the epoch.
+        """
+        pass
+
+    def search_results(self, run_id: Optional[str] = None, agent: Optional[str] = None,
+                       task_id: Optional[str] = None, success: Optional[bool] = None, since: Optional[int] = None,
+                       sort: Optional[str] = None, descending: bool = False, limit: Optional[int] = None,
+                       offset: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yields one page of the results matching all the given filters.
+
+        `since` is a timestamp in milliseconds. Results come in the order they were stored unless `sort` names
+        one of `SORT_FIELDS`; missing values sort first. This implementation filters `iter_results` as it
+        streams, and when sorting keeps only `offset + limit` rows; backends can push the query down instead.
+        """
+        rows = (result for result in self.iter_results(run_id=run_id, agent=agent)
+                if (task_id is None or str(result.get("task_id")) == str(task_id))
+                and (success is None or bool(result.get("success")) == success)
+                and (since is None or result.get("timestamp", 0) >= since))
+        if sort is not None:
+            if sort not in SORT_FIELDS:
+                raise ValueError(f"Cannot sort results by {sort}")
+
+            def key(result: Dict[str, Any]) -> float:
+                value = result.get(sort)
+                return float("-inf") if value is None else value
+
+            if limit is None:
+                rows = iter(sorted(rows, key=key, reverse=descending))
+            else:
+                select = heapq.nlargest if descending else heapq.nsmallest
+                rows = iter(select(offset + limit, rows, key=key))
+        return itertools.islice(rows, offset, None if limit is None else offset + limit)
+
+    def iter_latencies(self, agents: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yields the `task_id`, `agent` and `latency_ms` of the agents' results that have a latency, oldest
+        first, for estimating task durations. This implementation streams `iter_results` in stored order."""
+        for agent in agents:
+            for result in self.iter_results(agent=agent):
+                latency = result.get("latency_ms")
+                if latency is not None and latency > 0:
+                    yield {"task_id": result["task_id"], "agent": agent, "latency_ms": latency}
+
+    def query_results(self, run_id: Optional[str] = None, agent: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns the result records matching all the given filters."""
+        return list(self.iter_results(run_id=run_id, agent=agent))
+
+    def close(self) -> None:
+        """Releases any resources held by the backend."""
+        pass
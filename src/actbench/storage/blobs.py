@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOB_DIR = "blobs"
+
+# Responses whose JSON encoding is larger than this are moved out of the result row into the blob store.
+BLOB_THRESHOLD_BYTES = 2048
+
+# Characters of an out-of-line response kept in the row, so listings need not load the blob.
+PREVIEW_CHARS = 200
+
+
+class BlobStore:
+    """Content-addressed store of compressed blobs under `root`, one file per SHA-256 of the content.
+
+    Identical content is stored once. Blobs are compressed with zstd when the optional `zstandard` package is
+    installed and with gzip otherwise; `get` reads either.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + extension)
+
+    def exists(self, digest: str) -> bool:
+        return any(os.path.exists(self._path(digest, extension)) for extension in (".zst", ".gz"))
+
+    def put(self, data: bytes) -> str:
+        """Stores `data` unless it is already stored and returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.exists(digest):
+            return digest
+        if zstandard is not None:
+            path, payload = self._path(digest, ".zst"), zstandard.ZstdCompressor(level=3).compress(data)
+        else:
+            path, payload = self._path(digest, ".gz"), gzip.compress(data, compresslevel=6, mtime=0)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name and renamed, so a reader never sees a partial blob.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Returns the content stored under `digest`. Raises FileNotFoundError if there is none."""
+        path = self._path(digest, ".zst")
+        if os.path.exists(path):
+            if zstandard is None:
+                raise RuntimeError(f"Blob {digest} is zstd-compressed; reading it requires zstandard "
+                                   f"(pip install zstandard)")
+            with open(path, "rb") as f:
+                return zstandard.ZstdDecompressor().decompress(f.read())
+        with open(self._path(digest, ".gz"), "rb") as f:
+            return gzip.decompress(f.read())
+
+
+def offload_response(result: Dict[str, Any], blobs: BlobStore) -> Dict[str, Any]:
+    """Moves a large response into `blobs`. The returned row keeps a preview of it in `response` and its
+    digest in `response_blob`; small responses are left inline."""
+    response = result.get("response")
+    if response is None:
+        return result
+    data = json.dumps(response, default=str).encode("utf-8")
+    if len(data) <= BLOB_THRESHOLD_BYTES:
+        return result
+    text = response if isinstance(response, str) else data.decode("utf-8")
+    return {**result, "response": text[:PREVIEW_CHARS] + "…", "response_blob": blobs.put(data)}
+
+
+def resolve_response(result: Dict[str, Any], blobs: BlobStore) -> Dict[str, Any]:
+    """Returns the row with its full response loaded from `blobs`, if it was stored out of line.
+
+    If the blob cannot be read the row is returned unchanged, preview and all.
+    """
+    digest = result.get("response_blob")
+    if not digest:
+        return result
+    try:
+        response = json.loads(blobs.get(digest))
+    except (OSError, RuntimeError, ValueError) as e:
+        logging.error(f"Could not load the response of result {result.get('result_id')}: {e}")
+        return result
+    resolved = {key: value for key, value in result.items() if key != "response_blob"}
+    resolved["response"] = response
+    return resolved
@@ -0,0 +1,144 @@
+import csv
+import json
+from typing import Dict, Any, Iterable, List
+
+EXPORT_FORMATS = ("json", "jsonl", "csv", "parquet", "arrow")
+
+# Columns of the tabular formats (csv, parquet, arrow), in order. Any other field of a result goes into `extra`.
+EXPORT_COLUMNS = ("result_id", "run_id", "task_id", "agent", "success", "latency_ms", "score", "score_model",
+                  "score_prompt_version", "timestamp", "response", "phases", "extra")
+
+# Rows per record batch of the columnar formats; only one batch is held in memory at a time.
+BATCH_SIZE = 1000
+
+
+def _to_text(value: Any) -> Any:
+    """Nested values (e.g. a RaccoonAI `model_dump()` response) become JSON text in tabular formats."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _to_int(value: Any) -> Any:
+    return None if value is None else int(value)
+
+
+def _to_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    extra = {key: value for key, value in result.items() if key not in EXPORT_COLUMNS}
+    return {
+        "result_id": result.get("result_id"),
+        "run_id": result.get("run_id"),
+        "task_id": str(result.get("task_id")),
+        "agent": result.get("agent"),
+        "success": bool(result.get("success")),
+        "latency_ms": _to_int(result.get("latency_ms")),
+        "score": _to_int(result.get("score")),
+        "score_model": result.get("score_model"),
+        "score_prompt_version": result.get("score_prompt_version"),
+        "timestamp": _to_int(result.get("timestamp")),
+        "response": _to_text(result.get("response")),
+        "phases": result.get("phases"),
+        "extra": json.dumps(extra, default=str) if extra else None,
+    }
+
+
+def _write_json(results: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for result in results:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(result, default=str))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _write_jsonl(results: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, default=str) + "\n")
+            count += 1
+    return count
+
+
+def _write_csv(results: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    # The default dialect quotes fields containing commas, quotes or newlines and ends rows with CRLF (RFC 4180).
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for result in results:
+            record = _to_record(result)
+            record["phases"] = _to_text(record["phases"])
+            writer.writerow(["" if record[column] is None else record[column] for column in EXPORT_COLUMNS])
+            count += 1
+    return count
+
+
+def _write_columnar(results: Iterable[Dict[str, Any]], path: str, format_: str) -> int:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError(f"Exporting to {format_} requires pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("result_id", pa.string()),
+        ("run_id", pa.string()),
+        ("task_id", pa.string()),
+        ("agent", pa.string()),
+        ("success", pa.bool_()),
+        ("latency_ms", pa.int64()),
+        ("score", pa.int64()),
+        ("score_model", pa.string()),
+        ("score_prompt_version", pa.string()),
+        ("timestamp", pa.int64()),
+        ("response", pa.string()),
+        ("phases", pa.map_(pa.string(), pa.int64())),
+        ("extra", pa.string()),
+    ])
+    if format_ == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        import pyarrow.ipc as ipc
+        writer = ipc.new_file(path, schema)
+
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    try:
+        for result in results:
+            record = _to_record(result)
+            if record["phases"] is not None:
+                record["phases"] = list(record["phases"].items())
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+
+def export_results(results: Iterable[Dict[str, Any]], path: str, format_: str) -> int:
+    """Writes results to `path` as they are read, so memory use does not grow with the number of results.
+
+    `json` writes one array and `jsonl` one object per line, both with every field of each result. `csv`,
+    `parquet` and `arrow` (an Arrow IPC file) use the fixed `EXPORT_COLUMNS`, with nested values such as the
+    response as JSON text, except `phases`, which the columnar formats store as a map. They need the optional
+    `pyarrow` package. Returns the number of results written.
+    """
+    if format_ == "json":
+        return _write_json(results, path)
+    if format_ == "jsonl":
+        return _write_jsonl(results, path)
+    if format_ == "csv":
+        return _write_csv(results, path)
+    if format_ in ("parquet", "arrow"):
+        return _write_columnar(results, path, format_)
+    raise ValueError(f"Unsupported export format: {format_}")
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+
+from .base import BaseStorage
+from .blobs import BLOB_DIR, BlobStore
+
+RESULTS_LOG = "results.jsonl"
+RUN_METADATA_FILE = "run.json"
+RUN_SUMMARY_FILE = "summary.json"
+
+
+def read_results_file(filepath: str) -> List[Dict[str, Any]]:
+    """Reads either a legacy `<agent>.json` array or a newline-delimited `results.jsonl` log.
+
+    Update entries in a log are folded into the row they refer to.
+    """
+    results = []
+    with open(filepath, "r") as f:
+        if filepath.endswith(".jsonl"):
+            by_id: Dict[str, Dict[str, Any]] = {}
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.error(f"Warning: Skipping malformed line in {filepath}")
+                    continue
+                if "update" in record:
+                    target = by_id.get(record["update"].get("result_id"))
+                    if target is not None:
+                        target.update(record["update"])
+                    continue
+                results.append(record)
+                if "result_id" in record:
+                    by_id[record["result_id"]] = record
+        else:
+            try:
+                results.extend(json.load(f))
+            except json.JSONDecodeError:
+                logging.error(f"Warning: Could not decode JSON in {filepath}")
+    return results
+
+
+def iter_results_files(results_dir: str, run_id: Optional[str] = None):
+    """Yields every results file under `results_dir`, optionally restricted to one run."""
+    if not os.path.isdir(results_dir):
+        return
+    run_ids = [run_id] if run_id else [name for name in os.listdir(results_dir) if name != BLOB_DIR]
+    for run_id_ in run_ids:
+        run_dir = os.path.join(results_dir, run_id_)
+        if os.path.isdir(run_dir):
+            for results_file in os.listdir(run_dir):
+                if results_file.endswith((".json", ".jsonl")) \
+                        and results_file not in (RUN_METADATA_FILE, RUN_SUMMARY_FILE):
+                    yield os.path.join(run_dir, results_file)
+
+
+class JsonlStorage(BaseStorage):
+    """Stores results as one newline-delimited log per run under `results_dir`."""
+
+    def __init__(self, results_dir: str):
+        self.results_dir = results_dir
+        self.blobs = BlobStore(os.path.join(results_dir, BLOB_DIR))
+        self._lock = threading.Lock()
+
+    def insert_results(self, results: List[Dict[str, Any]]) -> None:
+        by_run: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            by_run.setdefault(result["run_id"], []).append(result)
+
+        with self._lock:
+            for run_id, rows in by_run.items():
+                run_dir = os.path.join(self.results_dir, run_id)
+                os.makedirs(run_dir, exist_ok=True)
+                with open(os.path.join(run_dir, RESULTS_LOG), "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def update_results(self, updates: List[Dict[str, Any]]) -> None:
+        self.insert_results([{"run_id": update["run_id"], "update": update} for update in updates])
+
+    def iter_results(self, run_id: Optional[str] = None, agent: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for filepath in iter_results_files(self.results_dir, run_id):
+            for result in read_results_file(filepath):
+                if agent and result.get("agent") != agent:
+                    continue
+                yield result
+
+    def save_run_metadata(self, run_id: str, metadata: Dict[str, Any]) -> None:
+        with self._lock:
+            run_dir = os.path.join(self.results_dir, run_id)
+            os.makedirs(run_dir, exist_ok=True)
+            merged = {**(self._read_run_metadata(run_id) or {}), **metadata}
+            path = os.path.join(run_dir, RUN_METADATA_FILE)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(merged, f, indent=2, default=str)
+            os.replace(path + ".tmp", path)
+
+    def get_run_metadata(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._read_run_metadata(run_id)
+
+    def _read_run_metadata(self, run_id: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.results_dir, run_id, RUN_METADATA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_run_ids(self) -> List[str]:
+        return sorted({os.path.basename(os.path.dirname(path)) for path in iter_results_files(self.results_dir)})
+
+    def save_run_summaries(self, run_id: str, summaries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            path = os.path.join(self.results_dir, run_id, RUN_SUMMARY_FILE)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(summaries, f, default=str)
+            os.replace(path + ".tmp", path)
+
+    def iter_run_summaries(self, run_id: Optional[str] = None, agent: Optional[str] = None,
+                           since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        if not os.path.isdir(self.results_dir):
+            return
+        summaries = []
+        for run_id_ in [run_id] if run_id else os.listdir(self.results_dir):
+            path = os.path.join(self.results_dir, run_id_, RUN_SUMMARY_FILE)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for summary in json.load(f):
+                    started_at = summary.get("started_at")
+                    if agent and summary["agent"] != agent:
+                        continue
+                    if since is not None and (started_at is None or started_at < since):
+                        continue
+                    if until is not None and (started_at is None or started_at >= until):
+                        continue
+                    summaries.append(summary)
+        summaries.sort(key=lambda summary: (summary.get("started_at") or 0, summary["run_id"], summary["agent"]))
+        yield from summaries
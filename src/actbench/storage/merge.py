@@ -0,0 +1,123 @@
+import os
+import sqlite3
+from typing import Dict, Any, List, Tuple
+
+from .base import BaseStorage
+from .blobs import resolve_response
+from .jsonl import JsonlStorage
+from .sqlite import SqliteStorage
+from .summaries import summarize_run
+
+# Manifest fields every shard of a run must agree on.
+MANIFEST_KEYS = ("task_ids", "agents", "dataset_hash")
+
+# How `merged_from` refers to the target store, for the shard that ran on it.
+TARGET_NAME = "local"
+
+
+def open_storage(path: str) -> BaseStorage:
+    """Opens another result store, read-only: a results directory (jsonl backend) or a SQLite database file.
+
+    Raises ValueError if `path` is neither.
+    """
+    if os.path.isdir(path):
+        return JsonlStorage(path)
+    if not os.path.isfile(path):
+        raise ValueError(f"No result store found at {path}")
+    storage = SqliteStorage(path, read_only=True)
+    try:
+        tables = {row[0] for row in storage._connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    except sqlite3.DatabaseError as e:
+        storage.close()
+        raise ValueError(f"{path} is not a results database: {e}")
+    if not {"results", "runs"} <= tables:
+        storage.close()
+        raise ValueError(f"{path} is not a results database: it has no results or runs table.")
+    return storage
+
+
+def _copy_response(result: Dict[str, Any], name: str, source: BaseStorage, target: BaseStorage) -> Dict[str, Any]:
+    """Copies the blob of a response stored out of line into the target's blob store, or back into the row if
+    the target keeps responses inline."""
+    digest = result.get("response_blob")
+    if not digest or source.blobs is None:
+        return result
+    if target.blobs is None:
+        return resolve_response(result, source.blobs)
+    if not target.blobs.exists(digest):
+        try:
+            data = source.blobs.get(digest)
+        except (OSError, RuntimeError) as e:
+            raise ValueError(f"The response of result {result.get('result_id')} is missing from {name}'s blob "
+                             f"store: {e}")
+        target.blobs.put(data)
+    return result
+
+
+def merge_run(target: BaseStorage, sources: Dict[str, BaseStorage], run_id: str) -> Dict[str, Any]:
+    """Copies one run's results from per-shard stores into `target`.
+
+    The shards' manifests, and the target's own if it has one, must agree on the task list, agents and
+    dataset. A (task, agent) pair that has results in several places keeps a single one: the target's own if
+    it has one, otherwise the latest.
+    Raises ValueError if a manifest is missing or the manifests disagree.
+    """
+    metadata = target.get_run_metadata(run_id) or {}
+    manifests: List[Tuple[str, Dict[str, Any]]] = []
+    # The target's own manifest: a shard's own, until the target first merges others into it.
+    if metadata.get("manifest") is not None:
+        manifests.append((TARGET_NAME, metadata["manifest"]))
+    for name, source in sources.items():
+        manifest = (source.get_run_metadata(run_id) or {}).get("manifest")
+        if manifest is None:
+            raise ValueError(f"{name} has no manifest for run '{run_id}'.")
+        manifests.append((name, manifest))
+
+    reference_name, reference = manifests[0]
+    for name, manifest in manifests[1:]:
+        for key in MANIFEST_KEYS:
+            if manifest.get(key) != reference.get(key):
+                raise ValueError(f"The manifests of {reference_name} and {name} disagree on '{key}'.")
+
+    # Shards merged into the target before count towards completeness too.
+    shards = [manifest.get("shard") for _, manifest in manifests] + [
+        source.get("shard") for source in metadata.get("merged_from", [])]
+    shard_counts = {shard[1] for shard in shards if shard}
+    if len(shard_counts) > 1:
+        raise ValueError(f"The stores were sharded differently: {sorted(shard_counts)} shards.")
+    seen_shards = {shard[0] for shard in shards if shard}
+    missing_shards = sorted(set(range(1, shard_counts.pop() + 1)) - seen_shards) if shard_counts else []
+
+    existing_ids = set()
+    existing_pairs = set()
+    for result in target.iter_results(run_id=run_id):
+        existing_ids.add(result.get("result_id"))
+        existing_pairs.add((str(result["task_id"]), result["agent"]))
+
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    origins: Dict[Tuple[str, str], str] = {}
+    duplicates = 0
+    for name, source in sources.items():
+        for result in source.iter_results(run_id=run_id):
+            pair = (str(result["task_id"]), result["agent"])
+            if result.get("result_id") in existing_ids or pair in existing_pairs:
+                duplicates += 1
+                continue
+            if pair in merged:
+                duplicates += 1
+                if merged[pair].get("timestamp", 0) >= result.get("timestamp", 0):
+                    continue
+            merged[pair] = result
+            origins[pair] = name
+
+    if merged:
+        target.insert_results([_copy_response(result, origins[pair], sources[origins[pair]], target)
+                               for pair, result in merged.items()])
+    merged_from = metadata.get("merged_from", []) + [
+        {"source": name, "shard": manifest.get("shard")} for name, manifest in manifests
+        if name != TARGET_NAME or manifest.get("shard")]
+    target.save_run_metadata(run_id, {"manifest": {**reference, "shard": None}, "merged_from": merged_from})
+    # The run's summary now has to cover the merged results too.
+    summarize_run(target, run_id)
+    return {"inserted": len(merged), "duplicates": duplicates, "missing_shards": missing_shards}
@@ -0,0 +1,265 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.request import pathname2url
+
+from .base import SORT_FIELDS, BaseStorage
+from .blobs import BLOB_DIR, BlobStore
+from .jsonl import iter_results_files, read_results_file
+
+_COLUMNS = ("result_id", "run_id", "agent", "task_id", "success", "latency_ms", "score", "timestamp", "response")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    result_id TEXT,
+    run_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    latency_ms INTEGER,
+    score INTEGER,
+    timestamp INTEGER NOT NULL,
+    response TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_run_id ON results (run_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_results_result_id ON results (result_id);
+CREATE INDEX IF NOT EXISTS idx_results_agent ON results (agent);
+CREATE INDEX IF NOT EXISTS idx_results_task_id ON results (task_id);
+CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results (timestamp);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_summaries (
+    run_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    started_at INTEGER,
+    finished_at INTEGER,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (run_id, agent)
+);
+CREATE INDEX IF NOT EXISTS idx_run_summaries_started_at ON run_summaries (started_at);
+"""
+
+_INSERT = (
+    "INSERT INTO results (result_id, run_id, agent, task_id, success, latency_ms, score, timestamp, response, extra) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Columns added after the first release of the schema, applied to existing databases on open.
+_MIGRATIONS = {
+    "result_id": "ALTER TABLE results ADD COLUMN result_id TEXT;"
+                 "UPDATE results SET result_id = lower(hex(randomblob(16))) WHERE result_id IS NULL;",
+}
+
+
+def _to_row(result: Dict[str, Any]) -> tuple:
+    extra = {key: value for key, value in result.items() if key not in _COLUMNS}
+    return (
+        result.get("result_id") or uuid.uuid4().hex,
+        result["run_id"],
+        result["agent"],
+        str(result["task_id"]),
+        int(bool(result.get("success"))),
+        result.get("latency_ms", -1),
+        result.get("score", -1),
+        result.get("timestamp", 0),
+        json.dumps(result.get("response"), default=str),
+        json.dumps(extra, default=str) if extra else None,
+    )
+
+
+def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    result = {
+        "result_id": row["result_id"],
+        "task_id": row["task_id"],
+        "agent": row["agent"],
+        "success": bool(row["success"]),
+        "latency_ms": row["latency_ms"],
+        "response": json.loads(row["response"]) if row["response"] is not None else None,
+        "timestamp": row["timestamp"],
+        "score": row["score"],
+        "run_id": row["run_id"],
+    }
+    if row["extra"]:
+        result.update(json.loads(row["extra"]))
+    return result
+
+
+class SqliteStorage(BaseStorage):
+    """Stores results in a single SQLite database, indexed for the common filters.
+
+    With `read_only`, the database is opened as it is, e.g. to read another machine's results: nothing is
+    written to it, not even the schema. `added_summaries` is True if opening it added the run summaries table
+    to a database that already had results, whose runs then have no summaries yet.
+    """
+
+    def __init__(self, db_path: str, read_only: bool = False):
+        self.db_path = db_path
+        self.read_only = read_only
+        self.blobs = BlobStore(os.path.join(os.path.dirname(db_path) or ".", BLOB_DIR))
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.added_summaries = False
+        if read_only:
+            return
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self._connection()
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(results)")}
+        if existing:
+            self.added_summaries = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'run_summaries'").fetchone() is None
+            for column, statement in _MIGRATIONS.items():
+                if column not in existing:
+                    conn.executescript(statement)
+        conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.read_only:
+                conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro", uri=True,
+                                       timeout=30, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if not self.read_only:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def insert_results(self, results: List[Dict[str, Any]]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany(_INSERT, [_to_row(result) for result in results])
+
+    def update_results(self, updates: List[Dict[str, Any]]) -> None:
+        conn = self._connection()
+        with conn:
+            for update in updates:
+                fields = {key: value for key, value in update.items() if key not in ("result_id", "run_id")}
+                row = conn.execute("SELECT extra FROM results WHERE result_id = ?",
+                                   (update["result_id"],)).fetchone()
+                if row is None:
+                    continue
+                columns = {key: value for key, value in fields.items() if key in _COLUMNS}
+                if "response" in columns:
+                    columns["response"] = json.dumps(columns["response"], default=str)
+                if "success" in columns:
+                    columns["success"] = int(bool(columns["success"]))
+                extra = {key: value for key, value in fields.items() if key not in _COLUMNS}
+                if extra:
+                    columns["extra"] = json.dumps({**json.loads(row["extra"] or "{}"), **extra}, default=str)
+                if columns:
+                    assignments = ", ".join(f"{column} = ?" for column in columns)
+                    conn.execute(f"UPDATE results SET {assignments} WHERE result_id = ?",
+                                 [*columns.values(), update["result_id"]])
+
+    def iter_results(self, run_id: Optional[str] = None, agent: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        return self.search_results(run_id=run_id, agent=agent)
+
+    def search_results(self, run_id: Optional[str] = None, agent: Optional[str] = None,
+                       task_id: Optional[str] = None, success: Optional[bool] = None, since: Optional[int] = None,
+                       sort: Optional[str] = None, descending: bool = False, limit: Optional[int] = None,
+                       offset: int = 0) -> Iterator[Dict[str, Any]]:
+        clauses, params = [], []
+        for clause, value in (("run_id = ?", run_id or None), ("agent = ?", agent or None),
+                              ("task_id = ?", None if task_id is None else str(task_id)),
+                              ("success = ?", None if success is None else int(success)),
+                              ("timestamp >= ?", since)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = "SELECT * FROM results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if sort is not None and sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort results by {sort}")
+        sql += f" ORDER BY {sort} {'DESC' if descending else 'ASC'}, id" if sort else " ORDER BY id"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset])
+        for row in self._connection().execute(sql, params):
+            yield _from_row(row)
+
+    def iter_latencies(self, agents: List[str]) -> Iterator[Dict[str, Any]]:
+        if not agents:
+            return
+        placeholders = ", ".join("?" * len(agents))
+        sql = (f"SELECT task_id, agent, latency_ms FROM results WHERE latency_ms > 0 AND agent IN ({placeholders}) "
+               "ORDER BY timestamp, id")
+        for row in self._connection().execute(sql, agents):
+            yield dict(row)
+
+    def save_run_metadata(self, run_id: str, metadata: Dict[str, Any]) -> None:
+        conn = self._connection()
+        with conn:
+            row = conn.execute("SELECT metadata FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            merged = {**(json.loads(row["metadata"]) if row else {}), **metadata}
+            conn.execute("INSERT OR REPLACE INTO runs (run_id, metadata) VALUES (?, ?)",
+                         (run_id, json.dumps(merged, default=str)))
+
+    def get_run_metadata(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT metadata FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row["metadata"]) if row else None
+
+    def list_run_ids(self) -> List[str]:
+        return [row["run_id"] for row in self._connection().execute("SELECT DISTINCT run_id FROM results")]
+
+    def save_run_summaries(self, run_id: str, summaries: List[Dict[str, Any]]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM run_summaries WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT INTO run_summaries (run_id, agent, started_at, finished_at, summary) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, summary["agent"], summary.get("started_at"), summary.get("finished_at"),
+                  json.dumps(summary, default=str)) for summary in summaries])
+
+    def iter_run_summaries(self, run_id: Optional[str] = None, agent: Optional[str] = None,
+                           since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        clauses, params = [], []
+        for clause, value in (("run_id = ?", run_id), ("agent = ?", agent), ("started_at >= ?", since),
+                              ("started_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = "SELECT summary FROM run_summaries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started_at, run_id, agent"
+        for row in self._connection().execute(sql, params):
+            yield json.loads(row["summary"])
+
+    def import_results_dir(self, results_dir: str) -> int:
+        """Imports legacy per-run JSON/JSONL result files. Files imported before are skipped."""
+        conn = self._connection()
+        imported = 0
+        for filepath in iter_results_files(results_dir):
+            key = os.path.abspath(filepath)
+            if conn.execute("SELECT 1 FROM imported_files WHERE path = ?", (key,)).fetchone():
+                continue
+            rows = [_to_row(result) for result in read_results_file(filepath)]
+            with conn:
+                conn.executemany(_INSERT, rows)
+                conn.execute("INSERT INTO imported_files (path) VALUES (?)", (key,))
+            imported += len(rows)
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
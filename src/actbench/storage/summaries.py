@@ -0,0 +1,39 @@
+from typing import Dict, Any, Iterable, List, Optional
+
+from .base import BaseStorage
+from ..stats import AgentStats, RunAggregator
+
+
+def build_summaries(run_id: str, aggregator: RunAggregator, started_at: Optional[int] = None) -> List[Dict[str, Any]]:
+    """One summary record per agent: its `AgentStats`, when the run started and when its last result came in."""
+    return [{"run_id": run_id, "agent": agent, "started_at": started_at or stats.first_timestamp,
+             "finished_at": stats.last_timestamp, "stats": stats.to_dict()}
+            for agent, stats in aggregator.agents.items()]
+
+
+def summarize_run(storage: BaseStorage, run_id: str) -> List[Dict[str, Any]]:
+    """Rebuilds and stores a run's summary records by streaming its results."""
+    aggregator = RunAggregator.from_results(storage.iter_results(run_id=run_id))
+    started_at = (storage.get_run_metadata(run_id) or {}).get("started_at")
+    summaries = build_summaries(run_id, aggregator, started_at)
+    storage.save_run_summaries(run_id, summaries)
+    return summaries
+
+
+def summarize_missing_runs(storage: BaseStorage) -> int:
+    """Summarizes every run that has results but no summary: runs from before summaries were stored, and runs
+    whose summary was dropped because their results changed. Returns the number of runs summarized."""
+    summarized = {summary["run_id"] for summary in storage.iter_run_summaries()}
+    missing = [run_id for run_id in storage.list_run_ids() if run_id not in summarized]
+    for run_id in missing:
+        summarize_run(storage, run_id)
+    return len(missing)
+
+
+def aggregator_from_summaries(summaries: Iterable[Dict[str, Any]]) -> RunAggregator:
+    """Rebuilds an aggregator from summary records. Records for the same agent are merged."""
+    aggregator = RunAggregator()
+    for summary in summaries:
+        stats = AgentStats.from_dict(summary["stats"])
+        aggregator.agents.setdefault(summary["agent"], AgentStats()).merge(stats)
+    return aggregator
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .base import BaseStorage
+from .blobs import offload_response
+from ..stats import QuantileSketch
+
+_STOP = object()
+_INSERT = "insert"
+_UPDATE = "update"
+
+# Attempts at writing a batch before it is spilled, and the wait before the first retry, doubled after each one.
+WRITE_ATTEMPTS = 4
+RETRY_DELAY_S = 0.2
+
+
+class ResultWriter:
+    """Hands result inserts and updates to a storage backend in batches from a single background thread.
+
+    Operations are applied in the order they were queued, so an update never lands before its insert.
+    Large responses of inserted records are moved to the backend's blob store here, off the callers' threads.
+    `stats` reports how long inserted records took from being queued to being committed.
+
+    A batch the backend fails to write is retried with backoff. If it still fails, its records are appended to
+    `spill_path` in the format of a jsonl results log (updates as `{"update": ...}` lines) instead of being lost.
+    """
+
+    def __init__(self, storage: BaseStorage, name: str = "results",
+                 batch_size: int = 64, flush_interval: float = 0.5, spill_path: Optional[str] = None):
+        self.storage = storage
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.batches = 0
+        self.spilled = 0
+        self.write_ms = 0.0
+        self.commit_ms = QuantileSketch()
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._drain, name=f"result-writer-{name}", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Queues a record for writing. Returns immediately."""
+        self._put((_INSERT, record))
+
+    def update(self, run_id: str, result_id: str, fields: Dict[str, Any]) -> None:
+        """Queues a partial update of a previously written record. Returns immediately."""
+        self._put((_UPDATE, {**fields, "run_id": run_id, "result_id": result_id}))
+
+    def _put(self, item) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Result writer for '{self.name}' is closed")
+            self._queue.put((*item, time.perf_counter()))
+
+    def flush(self) -> None:
+        """Blocks until every queued operation has been handed to the storage backend."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flushes pending records and stops the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _drain(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            operations = [item for item in batch if item is not _STOP]
+            stop = len(operations) < len(batch)
+            try:
+                self._apply(operations)
+            except Exception as e:
+                logging.error(f"Failed to write {len(operations)} results for {self.name}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, operations) -> None:
+        # Consecutive operations of the same kind go to the backend as one batch.
+        i = 0
+        while i < len(operations):
+            kind = operations[i][0]
+            j = i
+            while j < len(operations) and operations[j][0] == kind:
+                j += 1
+            records = [record for _, record, _ in operations[i:j]]
+            start = time.perf_counter()
+            if self._write(kind, records):
+                end = time.perf_counter()
+                self.batches += 1
+                self.write_ms += (end - start) * 1000
+                if kind == _INSERT:
+                    for _, _, queued_at in operations[i:j]:
+                        self.commit_ms.add((end - queued_at) * 1000)
+            i = j
+
+    def _write(self, kind: str, records: List[Dict[str, Any]]) -> bool:
+        """Writes one batch, retrying with backoff. Returns False if it was spilled instead."""
+        delay = RETRY_DELAY_S
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                if kind == _INSERT:
+                    rows = records
+                    if self.storage.blobs is not None:
+                        rows = [offload_response(record, self.storage.blobs) for record in records]
+                    self.storage.insert_results(rows)
+                else:
+                    self.storage.update_results(records)
+                return True
+            except Exception as e:
+                if attempt == WRITE_ATTEMPTS:
+                    logging.error(f"Failed to write {len(records)} results for {self.name} after {attempt} "
+                                  f"attempts: {e}")
+                    break
+                logging.warning(f"Failed to write {len(records)} results for {self.name}, retrying in "
+                                f"{delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay *= 2
+        self._spill(kind, records)
+        return False
+
+    def _spill(self, kind: str, records: List[Dict[str, Any]]) -> None:
+        if self.spill_path is None:
+            logging.error(f"Dropped {len(records)} results for {self.name}")
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a") as f:
+                for record in records:
+                    f.write(json.dumps(record if kind == _INSERT else {"update": record}, default=str) + "\n")
+        except OSError as e:
+            logging.error(f"Dropped {len(records)} results for {self.name}; saving them to {self.spill_path} "
+                          f"failed: {e}")
+            return
+        self.spilled += len(records)
+        logging.error(f"Saved {len(records)} unwritten results for {self.name} to {self.spill_path}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary suitable for the run metadata. Only meaningful once the writer is closed."""
+        return {
+            "inserted": self.commit_ms.count,
+            "batches": self.batches,
+            "write_ms": round(self.write_ms),
+            "commit_ms_avg": self.commit_ms.mean,
+            "commit_ms_p95": self.commit_ms.quantile(0.95),
+            "spilled": self.spilled,
+            "spill_path": self.spill_path if self.spilled else None,
+        }
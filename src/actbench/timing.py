@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Phases in the order a task goes through them. `agent` is the whole agent call, so for agents that open and
+# close their browser themselves it includes `browser_wait` and `browser_terminate`.
+PHASES = ("browser_wait", "browser_create", "agent", "browser_terminate", "scoring_wait", "scoring")
+
+_PHASES: ContextVar[Optional[Dict[str, int]]] = ContextVar("actbench_phases", default=None)
+
+
+@contextmanager
+def record_phases() -> Iterator[Dict[str, int]]:
+    """Collects the spans timed by the code run inside the block, as a dict of phase -> milliseconds.
+
+    The dict is shared with threads started through `asyncio.to_thread` and tasks created inside the block.
+    """
+    phases: Dict[str, int] = {}
+    token = _PHASES.set(phases)
+    try:
+        yield phases
+    finally:
+        _PHASES.reset(token)
+
+
+def add_phase(phase: str, ms: float) -> None:
+    """Adds `ms` to a phase of the task being recorded. Does nothing outside `record_phases`."""
+    phases = _PHASES.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0) + int(ms)
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    """Times the block as (part of) a phase of the task being recorded, even if the block raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(phase, (time.perf_counter() - start) * 1000)
+
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from actbench.browser import BaseBrowser, BrowserPool
+
+
+class FakeBrowser(BaseBrowser):
+    """Hands out a fake CDP URL, or fails to while `failing` is set."""
+
+    created = []
+    failing = threading.Event()
+
+    def __init__(self):
+        self.terminations = 0
+        FakeBrowser.created.append(self)
+
+    def get_cdp_url(self, url: str) -> str:
+        if FakeBrowser.failing.is_set():
+            raise RuntimeError("no session")
+        return f"ws://fake/{len(FakeBrowser.created)}"
+
+    def terminate(self):
+        self.terminations += 1
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_browser():
+    FakeBrowser.created = []
+    FakeBrowser.failing.clear()
+
+
+def test_warm_sessions_are_hits_and_terminated_once():
+    pool = BrowserPool(FakeBrowser, size=2)
+    pool.schedule(["https://a.example", "https://b.example", "https://c.example"])
+    for url in ["https://a.example", "https://b.example", "https://c.example", "https://d.example"]:
+        with pool.lease(url) as browser:
+            assert browser.get_cdp_url(url).startswith("ws://fake/")
+            browser.get_cdp_url(url)
+    pool.close()
+
+    assert (pool.hits, pool.misses) == (3, 1)
+    assert [browser.terminations for browser in FakeBrowser.created] == [1] * 4
+
+
+def test_unused_lease_gives_back_its_warm_session():
+    pool = BrowserPool(FakeBrowser, size=1)
+    pool.schedule(["https://a.example", "https://b.example"])
+    with pool.lease("https://a.example"):
+        pass
+    with pool.lease("https://b.example") as browser:
+        browser.get_cdp_url("https://b.example")
+    pool.close()
+
+    assert (pool.hits, pool.misses) == (1, 0)
+    assert [browser.terminations for browser in FakeBrowser.created] == [1, 1]
+
+
+def test_failed_lease_keeps_the_next_tasks_warm_session():
+    pool = BrowserPool(FakeBrowser, size=1)
+    url = "https://a.example"
+    with pool.lease(url) as failed:
+        FakeBrowser.failing.set()
+        with pytest.raises(RuntimeError):
+            failed.get_cdp_url(url)
+        FakeBrowser.failing.clear()
+        # The next task for the same URL is warmed while the failed lease is still open.
+        pool.schedule([url])
+        pool._ready[url][0].result()
+    with pool.lease(url) as browser:
+        browser.get_cdp_url(url)
+    pool.close()
+
+    assert (pool.hits, pool.misses) == (1, 0)
+    assert FakeBrowser.created[-1].terminations == 1
@@ -0,0 +1,40 @@
+import csv
+import json
+
+import pytest
+
+from actbench.storage.export import EXPORT_COLUMNS, export_results
+
+RESULTS = [
+    {"result_id": "a", "run_id": "run", "task_id": 1, "agent": "raccoonai", "success": True, "latency_ms": 100,
+     "score": 5, "timestamp": 1, "response": 'Said "hi",\nthen left', "phases": {"agent_ms": 90}},
+    {"result_id": "b", "run_id": "run", "task_id": "GitHub--2", "agent": "browseruse", "success": False,
+     "latency_ms": -1, "timestamp": 2, "response": {"steps": [1, 2]}, "score_model": None, "note": "retried"},
+]
+
+
+def test_csv_quotes_fields_and_ends_rows_with_crlf(tmp_path):
+    path = tmp_path / "results.csv"
+    assert export_results(iter(RESULTS), str(path), "csv") == 2
+
+    data = path.read_bytes()
+    assert data.startswith(",".join(EXPORT_COLUMNS).encode() + b"\r\n")
+    assert b'"Said ""hi"",\nthen left"' in data
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["response"] == 'Said "hi",\nthen left'
+    assert json.loads(rows[0]["phases"]) == {"agent_ms": 90}
+    assert (rows[1]["task_id"], rows[1]["success"], rows[1]["score"]) == ("GitHub--2", "False", "")
+    assert json.loads(rows[1]["response"]) == {"steps": [1, 2]}
+    assert json.loads(rows[1]["extra"]) == {"note": "retried"}
+
+
+def test_jsonl_keeps_every_field(tmp_path):
+    path = tmp_path / "results.jsonl"
+    assert export_results(iter(RESULTS), str(path), "jsonl") == 2
+    assert [json.loads(line) for line in path.read_text().splitlines()] == RESULTS
+
+
+def test_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError):
+        export_results(iter(RESULTS), str(tmp_path / "results.xml"), "xml")
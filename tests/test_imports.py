@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+
+# Agent SDKs that must only be imported when an agent or scoring actually runs.
+HEAVY_MODULES = ("langchain", "langchain_openai", "browser_use", "raccoonai")
+
+# Seconds `import actbench.cli` may take; it is well under a second without the SDKs.
+IMPORT_BUDGET_S = 2.0
+
+_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import actbench.cli
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def test_cli_import_is_lazy():
+    # A fresh interpreter, so modules imported by other tests do not count.
+    output = subprocess.run([sys.executable, "-c", _SCRIPT], capture_output=True, text=True, check=True).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+
+    assert report["loaded"] == []
+    assert report["elapsed"] < IMPORT_BUDGET_S
@@ -0,0 +1,81 @@
+import hashlib
+import sqlite3
+
+import pytest
+
+from actbench.storage.merge import merge_run, open_storage
+from actbench.storage.sqlite import SqliteStorage
+
+MANIFEST = {"task_ids": ["1", "2", "3"], "agents": ["raccoonai"], "dataset_hash": "abc"}
+
+
+def result(task_id, result_id, timestamp=1, **fields):
+    return {"task_id": task_id, "agent": "raccoonai", "run_id": "run", "success": True, "latency_ms": 100,
+            "timestamp": timestamp, "result_id": result_id, "response": "ok", **fields}
+
+
+def shard(tmp_path, name, index, results, manifest=MANIFEST):
+    storage = SqliteStorage(str(tmp_path / name / "results.db"))
+    storage.insert_results(results)
+    storage.save_run_metadata("run", {"manifest": {**manifest, "shard": [index, 3]}})
+    return storage
+
+
+def test_keeps_one_result_per_pair(tmp_path):
+    target = shard(tmp_path, "local", 1, [result(1, "a")])
+    sources = {"b": shard(tmp_path, "b", 2, [result(1, "b1"), result(2, "b2", timestamp=1)]),
+               "c": shard(tmp_path, "c", 3, [result(2, "c2", timestamp=2), result(3, "c3")])}
+
+    report = merge_run(target, sources, "run")
+
+    assert report == {"inserted": 2, "duplicates": 2, "missing_shards": []}
+    assert sorted(r["result_id"] for r in target.iter_results(run_id="run")) == ["a", "c2", "c3"]
+    assert merge_run(target, sources, "run")["inserted"] == 0
+
+
+def test_reports_missing_shards(tmp_path):
+    target = shard(tmp_path, "local", 1, [result(1, "a")])
+    report = merge_run(target, {"c": shard(tmp_path, "c", 3, [result(3, "c3")])}, "run")
+    assert report["missing_shards"] == [2]
+
+
+def test_rejects_disagreeing_or_missing_manifests(tmp_path):
+    target = shard(tmp_path, "local", 1, [])
+    other = shard(tmp_path, "b", 2, [], manifest={**MANIFEST, "dataset_hash": "def"})
+    with pytest.raises(ValueError, match="dataset_hash"):
+        merge_run(target, {"b": other}, "run")
+    with pytest.raises(ValueError, match="no manifest"):
+        merge_run(target, {"b": SqliteStorage(str(tmp_path / "empty.db"))}, "run")
+
+
+def test_opens_sources_read_only(tmp_path):
+    shard(tmp_path, "b", 2, [result(1, "b1")]).close()
+    path = tmp_path / "b" / "results.db"
+    before = hashlib.md5(path.read_bytes()).hexdigest()
+
+    source = open_storage(str(path))
+    assert [r["result_id"] for r in source.iter_results()] == ["b1"]
+    with pytest.raises(sqlite3.OperationalError):
+        source.insert_results([result(2, "b2")])
+    source.close()
+    assert hashlib.md5(path.read_bytes()).hexdigest() == before
+
+
+def test_rejects_stores_that_are_not_results_databases(tmp_path):
+    (tmp_path / "notes.txt").write_text("not a database")
+    conn = sqlite3.connect(tmp_path / "other.db")
+    conn.execute("CREATE TABLE things (id INTEGER)")
+    conn.close()
+
+    for name in ("notes.txt", "other.db", "missing.db"):
+        with pytest.raises(ValueError):
+            open_storage(str(tmp_path / name))
+    assert sqlite3.connect(tmp_path / "other.db").execute(
+        "SELECT name FROM sqlite_master WHERE name = 'results'").fetchone() is None
+
+
+def test_rejects_responses_missing_from_the_blob_store(tmp_path):
+    target = shard(tmp_path, "local", 1, [])
+    source = shard(tmp_path, "b", 2, [result(1, "b1", response_blob="0" * 64)])
+    with pytest.raises(ValueError, match="missing from b's blob store"):
+        merge_run(target, {"b": source}, "run")
@@ -0,0 +1,24 @@
+import time
+
+from actbench.ratelimit import RateLimiter
+
+
+def test_rate_allows_a_burst_of_one_seconds_requests():
+    limiter = RateLimiter(rate=4)
+    assert [limiter.reserve() for _ in range(4)] == [0.0] * 4
+    assert limiter.reserve() > 0
+
+
+def test_burst_of_one_spaces_every_request():
+    limiter = RateLimiter(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(3):
+        with limiter.limit():
+            pass
+    assert time.monotonic() - start >= 0.09
+
+
+def test_try_reserve_does_not_wait():
+    limiter = RateLimiter(rate=2)
+    assert [limiter.try_reserve() for _ in range(3)] == [True, True, False]
+    assert RateLimiter().try_reserve()
@@ -0,0 +1,38 @@
+from actbench.executor.scheduling import DomainScheduler
+
+
+def test_caps_jobs_per_domain():
+    scheduler = DomainScheduler([("a.com", 1), ("a.com", 2), ("b.com", 3)], max_per_domain=1)
+    assert [scheduler.next(), scheduler.next(), scheduler.next()] == [1, 3, None]
+    scheduler.done(1)
+    assert scheduler.next() == 2
+
+
+def test_announces_jobs_in_the_order_they_start():
+    announced = []
+    scheduler = DomainScheduler([("a.com", 1), ("a.com", 2), ("a.com", 3), ("b.com", 4), ("c.com", 5)],
+                                max_per_domain=1, lookahead=2, on_upcoming=announced.extend)
+    assert scheduler.next() == 1
+    assert announced == [1, 4]
+    assert scheduler.next() == 4
+    assert announced == [1, 4, 5]
+    # a.com is at its cap, so its next job is only announced once no other job can start before it.
+    assert scheduler.next() == 5
+    assert announced == [1, 4, 5, 2]
+
+
+def test_skips_jobs_whose_group_is_full():
+    free = {"x": 1, "y": 1}
+
+    def try_start(group):
+        if not free[group]:
+            return False
+        free[group] -= 1
+        return True
+
+    scheduler = DomainScheduler([("a.com", ("x", 1)), ("b.com", ("x", 2)), ("c.com", ("y", 3))],
+                                group_of=lambda item: item[0], try_start=try_start)
+    assert [scheduler.next(), scheduler.next(), scheduler.next()] == [("x", 1), ("y", 3), None]
+    free["x"] += 1
+    scheduler.done(("x", 1))
+    assert scheduler.next() == ("x", 2)
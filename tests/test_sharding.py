@@ -0,0 +1,23 @@
+import pytest
+
+from actbench.executor.sharding import parse_shard, shard_of
+
+
+def test_every_pair_belongs_to_exactly_one_shard():
+    pairs = [(str(task_id), agent) for task_id in range(300) for agent in ("raccoonai", "browseruse")]
+    shards = [[pair for pair in pairs if shard_of(*pair, 3) == index] for index in (1, 2, 3)]
+
+    assert sorted(pair for shard in shards for pair in shard) == sorted(pairs)
+    assert all(len(shard) > len(pairs) / 3 * 0.8 for shard in shards)
+
+
+def test_shards_are_stable():
+    # Machines running different shards of a run, possibly on other Python versions, must agree on them.
+    assert [shard_of("Allrecipes--1", "raccoonai", count) for count in (1, 2, 5, 7)] == [1, 2, 5, 5]
+
+
+def test_parses_shards():
+    assert parse_shard("2/3") == (2, 3)
+    for value in ("3", "0/3", "4/3"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
@@ -0,0 +1,69 @@
+import json
+import sqlite3
+
+from actbench.storage.sqlite import SqliteStorage
+
+
+def result(task_id, agent="raccoonai", run_id="run", **fields):
+    return {"task_id": task_id, "agent": agent, "run_id": run_id, "success": True, "latency_ms": 100,
+            "score": -1, "timestamp": 1, "response": "ok", **fields}
+
+
+def test_filters_sorts_and_updates_results(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "results.db"))
+    storage.insert_results([result(1, result_id="a", latency_ms=300), result(2, result_id="b", agent="browseruse"),
+                            result(3, result_id="c", run_id="other", latency_ms=200)])
+    storage.update_results([{"run_id": "run", "result_id": "a", "score": 5, "score_model": "gpt-4o"}])
+
+    assert [r["result_id"] for r in storage.search_results(sort="latency_ms")] == ["b", "c", "a"]
+    assert [r["result_id"] for r in storage.iter_results(run_id="run", agent="raccoonai")] == ["a"]
+    assert [r["result_id"] for r in storage.search_results(task_id=2)] == ["b"]
+    updated = next(storage.search_results(task_id=1))
+    assert (updated["score"], updated["score_model"], updated["task_id"]) == (5, "gpt-4o", "1")
+    storage.close()
+
+
+def test_adds_result_ids_to_databases_without_them(tmp_path):
+    path = tmp_path / "results.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, "
+                 "agent TEXT NOT NULL, task_id TEXT NOT NULL, success INTEGER NOT NULL, latency_ms INTEGER, "
+                 "score INTEGER, timestamp INTEGER NOT NULL, response TEXT, extra TEXT)")
+    conn.executemany("INSERT INTO results (run_id, agent, task_id, success, timestamp) VALUES (?, ?, ?, 1, 1)",
+                     [("run", "raccoonai", "1"), ("run", "raccoonai", "2")])
+    conn.commit()
+    conn.close()
+
+    storage = SqliteStorage(str(path))
+    result_ids = [r["result_id"] for r in storage.iter_results()]
+    storage.close()
+
+    assert len(result_ids) == 2 and all(result_ids) and result_ids[0] != result_ids[1]
+
+
+def test_imports_legacy_results_once(tmp_path):
+    run_dir = tmp_path / "results" / "run"
+    run_dir.mkdir(parents=True)
+    (run_dir / "raccoonai.json").write_text(json.dumps([result(1), result(2)]))
+    (run_dir / "results.jsonl").write_text("\n".join(json.dumps(record) for record in [
+        result(3, agent="browseruse", result_id="c"), {"update": {"result_id": "c", "score": 7}}]) + "\n")
+    (run_dir / "run.json").write_text(json.dumps({"started_at": 1}))
+
+    storage = SqliteStorage(str(tmp_path / "results.db"))
+    assert storage.import_results_dir(str(tmp_path / "results")) == 3
+    assert storage.import_results_dir(str(tmp_path / "results")) == 0
+    assert sorted(r["task_id"] for r in storage.iter_results(run_id="run")) == ["1", "2", "3"]
+    assert next(storage.search_results(task_id=3))["score"] == 7
+    storage.close()
+
+
+def test_reports_adding_the_summaries_table_to_existing_databases(tmp_path):
+    path = tmp_path / "results.db"
+    storage = SqliteStorage(str(path))
+    assert not storage.added_summaries
+    storage.insert_results([result(1)])
+    storage._connection().execute("DROP TABLE run_summaries")
+    storage.close()
+
+    assert SqliteStorage(str(path)).added_summaries
+    assert not SqliteStorage(str(path)).added_summaries
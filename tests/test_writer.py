@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from actbench.storage import writer as writer_module
+from actbench.storage.writer import ResultWriter
+
+
+class FlakyStorage:
+    """Keeps written rows in memory and fails the first `failures` writes."""
+
+    blobs = None
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.rows = []
+
+    def insert_results(self, results):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        self.rows.extend(results)
+
+    def update_results(self, updates):
+        self.insert_results([{"update": update} for update in updates])
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(writer_module, "RETRY_DELAY_S", 0)
+
+
+def test_retries_failed_writes(tmp_path):
+    storage = FlakyStorage(failures=writer_module.WRITE_ATTEMPTS - 1)
+    writer = ResultWriter(storage, spill_path=str(tmp_path / "unwritten.jsonl"))
+    writer.write({"result_id": "a"})
+    writer.close()
+
+    assert storage.rows == [{"result_id": "a"}]
+    assert writer.stats()["spilled"] == 0
+    assert not (tmp_path / "unwritten.jsonl").exists()
+
+
+def test_spills_writes_that_keep_failing(tmp_path):
+    spill_path = tmp_path / "unwritten.jsonl"
+    writer = ResultWriter(FlakyStorage(failures=2 * writer_module.WRITE_ATTEMPTS), spill_path=str(spill_path),
+                          flush_interval=0)
+    writer.write({"result_id": "a"})
+    writer.flush()
+    writer.update("run", "a", {"score": 5})
+    writer.close()
+
+    assert [json.loads(line) for line in spill_path.read_text().splitlines()] == [
+        {"result_id": "a"}, {"update": {"score": 5, "run_id": "run", "result_id": "a"}}]
+    assert writer.stats()["spilled"] == 2